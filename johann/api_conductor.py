@@ -160,7 +160,7 @@ async def get_score(request: "Request") -> "Response":
         return util.johann_response(False, f"unrecognized score '{score_name}'", 404)
 
     score = scores[score_name]
-    return util.johann_response(True, [], data=score.dump())
+    return util.johann_response(True, [], data=score.to_status_dict())
 
 
 async def get_host(request: "Request") -> "Response":
@@ -388,12 +388,10 @@ def _get_measure_helper(
     if score_name not in scores:
         return None, f"unrecognized score '{score_name}'"
 
-    score = scores[score_name]
-    measure_names = [x.name for x in score.measures]
-    if measure_name not in measure_names:
+    measure = scores[score_name].get_measure(measure_name)
+    if not measure:
         return None, f"unrecognized measure '{measure_name}'"
 
-    measure = [x for x in score.measures if x.name == measure_name][0]
     return measure, None
 
 
@@ -426,15 +424,12 @@ async def manually_play_measure(request: "Request") -> "Response":
         return util.johann_response(False, f"unrecognized score '{score_name}'", 404)
 
     score = scores[score_name]
-    measure_names = [x.name for x in score.measures]
-    if measure_name not in measure_names:
+    m = score.get_measure(measure_name)
+    if not m:
         return util.johann_response(
             False, f"unrecognized measure '{measure_name}'", 404
         )
 
-    measure = [x for x in score.measures if x.name == measure_name][0]
-    m = measure
-
     if m.started():
         if (
             "force" in request.rel_url.query
@@ -494,6 +489,7 @@ async def roll_call(request: "Request") -> "Response":
                     if success is None:
                         pass  # no changes required
                     elif success:
+                        score.invalidate_host_totals()
                         logger.debug(
                             f"roll_call: updated player '{p.name}'"
                             f" to:\n{score_player.dump()}"
@@ -607,6 +603,42 @@ async def retrieve_stored_data_4(request: "Request") -> "Response":
     return await _retrieve_stored_data(score_name, key, subkey, subsubkey, subsubsubkey)
 
 
+# POST body is a list of key paths, each a list of up to four keys (as in the
+# stored_data GET routes); responds with one {success, messages, data} per path
+async def retrieve_stored_data_batch(request: "Request") -> "Response":
+    if config.TRACE:
+        logger.debug(f"{request.url}")
+    score_name = request.match_info["score_name"]
+    if score_name not in scores:
+        return util.johann_response(False, f"unrecognized score '{score_name}'", 404)
+    score = scores[score_name]
+
+    try:
+        paths = await request.json()
+    except json.JSONDecodeError as e:
+        msg = "retrieve_stored_data_batch: invalid json"
+        logger.warning(f"{msg}\n{str(e)}")
+        return util.johann_response(False, msg, 400)
+
+    if not isinstance(paths, list) or not all(
+        isinstance(path, list) and len(path) <= 4 for path in paths
+    ):
+        msg = "expected a list of key paths of at most four keys each"
+        return util.johann_response(False, msg, 400)
+
+    results = []
+    for path in paths:
+        # same convenience conversion of 'None' keys as retrieve_stored_data_4
+        keys = [None if k is None or str(k).lower() == "none" else str(k) for k in path]
+        success, msg, _, data = score.fetch_stored_data(*keys)
+        logger.debug(f"retrieve_stored_data_batch API call: {msg}")
+        messages = [msg] if msg else []
+        results.append({"success": success, "messages": messages, "data": data})
+
+    # fetched by players rather than read by people, so skip the indentation
+    return util.johann_response(True, [], data=results, pretty=False)
+
+
 async def _retrieve_stored_data(
     score_name: str,
     key: Optional[str] = None,
@@ -622,10 +654,10 @@ async def _retrieve_stored_data(
         key, subkey, subsubkey, subsubsubkey
     )
     logger.debug(f"retrieve_stored_data API call: {msg}")
-    return util.johann_response(success, msg, code, data=data)
+    return util.johann_response(success, msg, code, data=data, pretty=False)
 
 
 async def api_get_codehash(request: "Request") -> "Response":
     if config.TRACE:
         logger.debug(f"{request.url}")
-    return util.johann_response(True, [], data=util.get_codehash())
+    return util.johann_response(True, [], data=util.get_codehash(), pretty=False)
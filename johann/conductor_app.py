@@ -91,6 +91,9 @@ def init_conductor() -> None:
         "/scores/{score_name}/measures/{measure_name}/play", api.manually_play_measure
     )
     app.router.add_get("/scores/{score_name}/stored_data", api.retrieve_stored_data_all)
+    app.router.add_post(
+        "/scores/{score_name}/stored_data", api.retrieve_stored_data_batch
+    )
     app.router.add_get(
         "/scores/{score_name}/stored_data/{key}", api.retrieve_stored_data_1
     )
@@ -131,6 +134,10 @@ def init_conductor() -> None:
 
     runner = aiohttp.web.AppRunner(app)
     loop = asyncio.get_event_loop()
+    if hasattr(asyncio, "eager_task_factory"):  # Python 3.12+
+        # coroutines that finish without awaiting (e.g. play_the_player) skip the
+        # scheduler entirely
+        loop.set_task_factory(asyncio.eager_task_factory)
     loop.run_until_complete(runner.setup())
     site = aiohttp.web.TCPSite(
         runner, str(config.JOHANN_HOST.ip), config.CONDUCTOR_PORT
@@ -2,7 +2,7 @@
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
 import os
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 
 import docker
 from docker.errors import DockerException
@@ -49,6 +49,15 @@ class DockerHostControl(HostControl):
                     return True
         return False
 
+    @classmethod
+    def list_existing(cls, control_names: Iterable[str]) -> Set[str]:
+        # a single containers call, rather than one per name
+        existing = set()
+        for c in api_client.containers():
+            for n in c["Names"]:
+                existing.add(n.replace("/", "", 1))
+        return existing.intersection(control_names)
+
     @staticmethod
     def get_container_from_name(name: str) -> Optional["Container"]:
         for c in api_client.containers():
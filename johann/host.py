@@ -14,7 +14,7 @@ from marshmallow_enum import EnumField
 
 from johann.shared.config import JohannConfig, celery_app
 from johann.shared.enums import HostOS, PmtrVariant, TaskState
-from johann.shared.fields import LaxStringField, NameField
+from johann.shared.fields import HostNameField, LaxStringField
 from johann.shared.logger import JohannLogger
 from johann.util import gudlog, safe_name
 
@@ -30,7 +30,7 @@ class HostSchema(Schema):
     class Meta:
         ordered = True
 
-    name = NameField(
+    name = HostNameField(
         required=True, data_key="hostname"
     )  # hostname for network use (i.e. fqdn, hostname, or, if necessary, IP)
     control_name = fields.Str(
@@ -136,6 +136,8 @@ class Host(object):
         ] = []  # note that finished tasks may be cleared from this list at any time
         # only tasks that are currently running can be relied upon to be here
         self.last_confirmed_on: Optional[datetime] = None
+        # time.monotonic() of last_confirmed_on, used to age the confirmation
+        self.last_confirmed_on_mono: Optional[float] = None
 
         logger.debug(f"Creating Host object for '{name}'")
 
@@ -431,6 +433,10 @@ class Host(object):
             self.pip_offline_install = config.DEFAULT_PIP_OFFLINE_INSTALL
             return False
 
+    def mark_confirmed_on(self, now: datetime, now_mono: float) -> None:
+        self.last_confirmed_on = now
+        self.last_confirmed_on_mono = now_mono
+
     def is_playing(self) -> bool:
         self.clear_finished_celery_task_ids()
         if len(self.celery_task_ids) > 0:
@@ -5,7 +5,7 @@ import hashlib
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 
 from johann.shared.config import JohannConfig
 from johann.shared.enums import HostOS, PmtrVariant
@@ -45,6 +45,11 @@ class HostControl(ABC):
     def host_exists(host_name: str) -> bool:
         pass
 
+    @classmethod
+    def list_existing(cls, control_names: Iterable[str]) -> Set[str]:
+        # subclasses that can list all of their hosts at once should override this
+        return {n for n in control_names if cls.host_exists(n)}
+
     @abstractmethod
     def put_archive(
         self,
@@ -1,7 +1,7 @@
 # Copyright (c) 2019-present, The Johann Authors. All Rights Reserved.
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
-from typing import TYPE_CHECKING, List, Optional, Tuple, Type
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
 
 from johann.docker_host_control import DockerHostControl
 from johann.shared.config import JohannConfig
@@ -15,11 +15,17 @@ if TYPE_CHECKING:
 config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
+# resolved classes by control method; failures are not cached, as plugins providing
+# a control method may be loaded later
+_host_control_classes: Dict[str, Type["HostControl"]] = {}
+
 
 def get_host_control_class(
     control_method: str,
 ) -> Tuple[Optional[Type["HostControl"]], Optional[str]]:
-    if control_method.upper() == "DOCKER":
+    if control_method in _host_control_classes:
+        return _host_control_classes[control_method], None
+    elif control_method.upper() == "DOCKER":
         return DockerHostControl, None
     elif control_method not in config.HOST_CONTROL_CLASS_NAMES:
         msg = f"unrecognized control method '{control_method}'"
@@ -30,6 +36,7 @@ def get_host_control_class(
         msg = f"failed to find class for control method '{control_method}'"
         return None, msg
 
+    _host_control_classes[control_method] = host_control_class
     return host_control_class, None
 
 
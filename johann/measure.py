@@ -3,7 +3,7 @@
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
 import json
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from marshmallow import Schema
 from marshmallow import ValidationError as MarshmallowValidationError
@@ -14,9 +14,10 @@ from johann.shared.enums import TaskState
 from johann.shared.fields import NameField, StateField
 from johann.shared.logger import JohannLogger
 from johann.util import (
+    LazyGudlog,
     celery_group_status,
     get_attr,
-    gudlog,
+    json_dumps,
     parse_special_arg,
     task_state_priority,
 )
@@ -31,6 +32,53 @@ config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
 
+def aggregate_task_status(
+    task_status: Dict[str, Dict[str, Any]], state: TaskState, num_players: int
+) -> Tuple[TaskState, bool, Dict[str, Dict[str, str]]]:
+    """Aggregates the group task status of each player into a measure-level state.
+
+    This is the hot loop of Measure.evaluate_state, kept free of object attribute
+    access so that it can be profiled (or compiled) in isolation.
+
+    Args:
+        task_status: The output of Measure.get_task_status(short=False).
+        state: The measure's current state.
+        num_players: The number of players in the measure.
+
+    Returns:
+        Tuple of:
+            the new measure state
+            whether the measure is finished
+            the non-empty statuses, keyed by player name
+    """
+    success = 0
+    finished = 0
+    player_status = {}
+    state_priority = task_state_priority(state)
+    for player_name, tstat in task_status.items():
+        if tstat["finished"]:
+            finished += 1
+        if tstat["state"] == TaskState.SUCCESS:
+            success += 1
+
+        tstat_priority = task_state_priority(tstat["state"])
+        if tstat_priority > state_priority:
+            state = tstat["state"]
+            state_priority = tstat_priority
+
+        if tstat["status"]:
+            player_status[player_name] = tstat["status"]
+
+    measure_finished = state == TaskState.FAILURE and finished == len(task_status)
+
+    if success == num_players:
+        state = TaskState.SUCCESS
+    if finished == num_players:
+        measure_finished = True
+
+    return state, measure_finished, player_status
+
+
 class MeasureSchema(Schema):
     class Meta:
         ordered = True
@@ -75,6 +123,9 @@ class MeasureSchema(Schema):
     def validate_start_delay(self, value):
         msg = "start_delay must be an integer or a special argument string"
         if isinstance(value, str):
+            # cheap rejection of plain strings (e.g. "5") before any regex work
+            if not value.startswith("johann."):
+                raise MarshmallowValidationError(msg)
             try:
                 parse_special_arg(value)
             except ValueError:
@@ -159,6 +210,10 @@ class Measure(object):
         self.finished: bool = False
         self.celery_group_tasks: Dict[str, "GroupResult"] = {}  # keys are Player names
         self.local_measure: bool = False  # whether or not run locally by conductor
+        self.queued: bool = False  # set once the score has queued this measure
+        self.status_dirty: bool = False  # status changed since the score last copied it
+
+        self._signature_base_opts: Optional[Dict[str, Any]] = None
 
     def __repr__(self) -> str:
         format_str = (
@@ -170,10 +225,16 @@ class Measure(object):
         return format_str
 
     def dump(self) -> Dict[str, Any]:
-        return MeasureSchema().dump(self)
+        return _MEASURE_SCHEMA.dump(self)
 
     def dumps(self) -> str:
-        return MeasureSchema().dumps(self)
+        return json_dumps(self.dump())
+
+    def get_signature_base_opts(self) -> Dict[str, Any]:
+        # options shared by every local task signature of this measure
+        if self._signature_base_opts is None:
+            self._signature_base_opts = {"queue": config.CELERY_QUEUE_ID}
+        return self._signature_base_opts
 
     def store_results(
         self, score: "Score", task_status: Dict[str, Any]
@@ -181,39 +242,39 @@ class Measure(object):
         if not self.store_as:
             return None
 
+        store_singleton = self.store_singleton
+        store_interim_results = self.store_interim_results
+        task_map = score.task_map
+        store = score.store_results
+
         results = {}
         for player_name, tstat in task_status.items():
             results_p = {}
             for t_id, t in tstat["tasks"].items():
-                t_result = None
-
                 if "result" in t:
                     t_result = t["result"]
-                elif (
-                    self.store_interim_results
-                    and "meta" in t
-                    and t["meta"]
-                    and "interim_result" in t["meta"]
-                ):
-                    t_result = t["meta"]["interim_result"]
+                elif store_interim_results and isinstance(t.get("meta"), dict):
+                    t_result = t["meta"].get("interim_result")
+                else:
+                    t_result = None
 
                 if t_result is not None:
-                    if self.store_singleton:
-                        score.store_results(self, None, t_result)
+                    if store_singleton:
+                        store(self, None, t_result)
 
-                    if t_id not in score.task_map:
+                    if t_id not in task_map:
                         msg = (
                             f"task {t_id} not found in task_map. This is probably bad."
                         )
-                        logger.info(gudlog(msg, score, player_name, self))
+                        logger.info(LazyGudlog(msg, score, player_name, self))
                         results_p[t_id] = t_result
                     else:
-                        results_p[score.task_map[t_id]["host_name"]] = t_result
+                        results_p[task_map[t_id]["host_name"]] = t_result
 
             results[player_name] = results_p
 
-            if results_p and not self.store_singleton:
-                score.store_results(self, player_name, results_p)
+            if results_p and not store_singleton:
+                store(self, player_name, results_p)
 
         return results
 
@@ -222,31 +283,19 @@ class Measure(object):
 
         prior_state = self.state
 
-        success = 0
-        finished = 0
-        for player_name, tstat in task_status.items():
-            if tstat["finished"]:
-                finished += 1
-            if tstat["state"] == TaskState.SUCCESS:
-                success += 1
-
-            if task_state_priority(tstat["state"]) > task_state_priority(self.state):
-                self.state = tstat["state"]
-
-            if tstat["status"]:
-                self.status[player_name] = tstat["status"]
-
-        if self.state == TaskState.FAILURE and finished == len(task_status):
-            self.finished = True
-
-        if success == len(self.player_names):
-            self.state = TaskState.SUCCESS
-        if finished == len(self.player_names):
+        self.state, finished, player_status = aggregate_task_status(
+            task_status, self.state, len(self.player_names)
+        )
+        for player_name, status in player_status.items():
+            if self.status.get(player_name) != status:
+                self.status[player_name] = status
+                self.status_dirty = True
+        if finished:
             self.finished = True
 
         if self.state == TaskState.FAILURE and self.state != prior_state:
             msg = f"measure '{self.name}' failed:\n{json.dumps(self.status, indent=2)}"
-            logger.warning(gudlog(msg, score))
+            logger.warning(LazyGudlog(msg, score))
 
         self.store_results(score, task_status)
 
@@ -260,7 +309,7 @@ class Measure(object):
         status = {}
         if self.start_delay is not None:
             status["start_delay"] = self.start_delay
-        if self.depends_on is not []:
+        if self.depends_on:
             status["depends_on"] = self.depends_on
         status["dependency_proof"] = self.dependency_proof
         status["state"] = self.state
@@ -273,9 +322,15 @@ class Measure(object):
         return status
 
     def get_task_status(self, short: bool = False) -> Dict[str, Any]:
+        if not self.celery_group_tasks:
+            return {}
+
         status = {}
 
         for player_name, group_task in self.celery_group_tasks.items():
             status[player_name] = celery_group_status(group_task, short=short)
 
         return status
+
+
+_MEASURE_SCHEMA = MeasureSchema()
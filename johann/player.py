@@ -10,7 +10,7 @@ from marshmallow import Schema, fields, post_load
 from johann.shared.config import JohannConfig, hosts
 from johann.shared.fields import NameField
 from johann.shared.logger import JohannLogger
-from johann.util import gudlog
+from johann.util import LazyGudlog, json_dumps
 
 if TYPE_CHECKING:
     from celery.canvas import Signature
@@ -60,10 +60,10 @@ class Player(object):
         )
 
     def dump(self) -> Dict[str, Any]:
-        return PlayerSchema().dump(self)
+        return _PLAYER_SCHEMA.dump(self)
 
     def dumps(self) -> str:
-        return PlayerSchema().dumps(self)
+        return json_dumps(self.dump())
 
     def copy_from(
         self, player: "Player", score: "Score"
@@ -97,19 +97,19 @@ class Player(object):
             msg = "updating hostnames from {} to {}".format(
                 self.hostnames, player.hostnames
             )
-            logger.debug(gudlog(msg, score, self))
+            logger.debug(LazyGudlog(msg, score, self))
             self.hostnames = player.hostnames
 
         if player.scale != self.scale:
             changed = True
             msg = "updating scale from {} to {}".format(self.scale, player.scale)
-            logger.debug(gudlog(msg, score, self))
+            logger.debug(LazyGudlog(msg, score, self))
             self.scale = player.scale
 
         if player.image != self.image:
             changed = True
             msg = "updating image from {} to {}".format(self.image, player.image)
-            logger.debug(gudlog(msg, score, self))
+            logger.debug(LazyGudlog(msg, score, self))
             self.image = player.image
 
         if not changed:
@@ -125,13 +125,16 @@ class Player(object):
         func: str,
         delay: int,
         *args: Any,
+        base_opts: Optional[Dict[str, Any]] = None,
     ) -> "Signature":
         description = f"{score_name}.LOCAL.{measure_name}.{host.name}"
         task_id = str(
             uuid4()
         )  # we need to know the task_id a priori for score.task_map
+        if base_opts is None:
+            base_opts = {"queue": config.CELERY_QUEUE_ID}
         sig_opts = {
-            "queue": config.CELERY_QUEUE_ID,
+            **base_opts,
             "shadow": description,
             "task_id": task_id,
             "countdown": delay,
@@ -151,22 +154,29 @@ class Player(object):
         self, score: "Score", measure: "Measure", func: str, delay: int, *args: Any
     ) -> Tuple[bool, Optional[str], Optional["GroupResult"]]:
         signatures = []
+        base_opts = measure.get_signature_base_opts() if measure.local_measure else None
 
         for hostname in self.hostnames:
             if hostname not in hosts:
                 msg = "{} not found in dictionary of hosts".format(hostname)
-                logger.warning(gudlog(msg, score, self, measure.name))
+                logger.warning(LazyGudlog(msg, score, self, measure.name))
                 return False, msg, None
             host = hosts[hostname]
 
             if measure.local_measure:
                 sig = Player.get_local_task_signature(
-                    score.name, measure.name, host, func, delay, *args
+                    score.name,
+                    measure.name,
+                    host,
+                    func,
+                    delay,
+                    *args,
+                    base_opts=base_opts,
                 )
             else:
                 if host.pending_create:
                     msg = "{} still pending creation".format(host.name)
-                    logger.warning(gudlog(msg, score, self, measure.name))
+                    logger.warning(LazyGudlog(msg, score, self, measure.name))
                     return False, msg, None
 
                 sig = host.get_task_signature(
@@ -177,7 +187,7 @@ class Player(object):
 
             if sig is None:
                 msg = "task signature creation failed for hostname {}".format(host.name)
-                logger.warning(gudlog(msg, score, self, measure.name))
+                logger.warning(LazyGudlog(msg, score, self, measure.name))
                 return False, msg, None
 
             score.task_map[sig.id] = {
@@ -192,3 +202,6 @@ class Player(object):
         group_result = task_group.apply_async()
 
         return True, None, group_result
+
+
+_PLAYER_SCHEMA = PlayerSchema()
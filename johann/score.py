@@ -2,11 +2,23 @@
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
 import asyncio
-import copy
+import itertools
+import logging
 import pprint
+import secrets
+import time
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
-from uuid import uuid4
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
 from marshmallow import Schema
 from marshmallow import ValidationError as MarshmallowValidationError
@@ -15,8 +27,8 @@ from marshmallow import fields, post_load
 from johann.docker_host_control import DockerHostControl
 from johann.host import HostSchema
 from johann.host_control_util import get_host_control_class, get_host_names
-from johann.measure import MeasureSchema
-from johann.player import PlayerSchema
+from johann.measure import _MEASURE_SCHEMA, MeasureSchema
+from johann.player import _PLAYER_SCHEMA, PlayerSchema
 from johann.shared.config import JohannConfig, hosts, scores
 from johann.shared.enums import TaskState
 from johann.shared.fields import NameField, StateField
@@ -33,6 +45,7 @@ from johann.util import (
 
 if TYPE_CHECKING:
     from johann.host import Host
+    from johann.host_control import HostControl
     from johann.measure import Measure
     from johann.player import Player
 
@@ -40,8 +53,11 @@ if TYPE_CHECKING:
 config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
+# how long a host's confirmation of being on is trusted, in seconds
+_HOST_CONFIRMED_VALID = float(config.HOST_CONFIRMED_ON_VALID_SECS)
+
 
-conductor_local_measure_dicts = [
+conductor_local_measure_dicts = (
     {
         "name": "tune_orchestra",
         "players": [config.CONDUCTOR_ALLHOSTS_PLAYER_NAME],
@@ -55,7 +71,24 @@ conductor_local_measure_dicts = [
     # 'task': 'johann.conductor_tasks.create_hosts',
     # 'start_delay': 10
     # },
-]
+)
+_LOCAL_MEASURE_NAMES: FrozenSet[str] = frozenset(
+    x["name"] for x in conductor_local_measure_dicts
+)
+
+_tarball_lock: Optional[asyncio.Lock] = None
+
+
+async def _create_johann_tarball() -> bool:
+    # tar can take a while, so build in an executor rather than blocking the event
+    # loop; the lock keeps concurrently starting scores from writing the same file
+    global _tarball_lock
+    if _tarball_lock is None:
+        _tarball_lock = asyncio.Lock()
+
+    async with _tarball_lock:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, create_johann_tarball)
 
 
 class ScoreSchema(Schema):
@@ -101,8 +134,7 @@ class ScoreSchema(Schema):
     # depends on post_load, so we do not use @validates_schema here
     def validate_score(self, score: "Score", **kwargs) -> None:
         self.validate_unique(score)
-        self.validate_measure_player_names(score)
-        self.validate_measure_depends_on(score)
+        self.validate_measures(score)
 
     def validate_unique(self, score: "Score", **kwargs) -> None:
         if score.name in scores:
@@ -110,12 +142,12 @@ class ScoreSchema(Schema):
                 f"There is already a score with name '{score.name}'"
             )
 
-    def validate_measure_player_names(self, score: "Score", **kwargs) -> None:
+    def validate_measures(self, score: "Score", **kwargs) -> None:
         # no duplicate measure names
-        measure_names = [x.name for x in score.measures]
-        if len(set(measure_names)) != len(measure_names):
+        if len({m.name for m in score.measures}) != len(score.measures):
             raise MarshmallowValidationError("Duplicate measure name(s)")
 
+        bad_deps = []
         for measure in score.measures:
             # all players specified in measure also exist in score's list of players
             for player_name in measure.player_names:
@@ -125,12 +157,9 @@ class ScoreSchema(Schema):
                         f" '{measure.name}'"
                     )
 
-    def validate_measure_depends_on(self, score: "Score", **kwargs) -> None:
-        measure_names = [x.name for x in score.measures]
-        bad_deps = []
-        for measure in score.measures:
+            # all dependencies are measures in this score
             for dep in measure.depends_on:
-                if dep not in measure_names:
+                if score.get_measure(dep) is None:
                     bad_deps.append(dep)
 
         if len(bad_deps) > 0:
@@ -142,6 +171,7 @@ class ScoreSchema(Schema):
     def make_score(self, data: Dict, original_data: Dict, **kwargs) -> "Score":
         score = Score(**data, original_data=original_data)
         self.validate_score(score)
+        score._build_dag()
         return score
 
 
@@ -164,6 +194,7 @@ class Score(object):
         self.description: str = description
         self.players: Dict[str, "Player"] = players
         self.measures: List["Measure"] = measures
+        self._measures_by_name: Dict[str, "Measure"] = {m.name: m for m in measures}
         self.create_hosts: bool = create_hosts
         self.discard_hosts: bool = discard_hosts
         self.original_data: Dict[str, Any] = original_data
@@ -182,6 +213,22 @@ class Score(object):
         # player/host that they 'belong' to
         self.last_successful_roll_call: Optional[datetime] = None
 
+        # dependency graph for the scheduler; rebuilt at the start of play()
+        self._dependents: Dict[str, List["Measure"]] = {}
+        self._remaining_deps: Dict[str, int] = {}
+        self._priority: Dict[str, int] = {}
+        self._completion_queue: Optional[asyncio.Queue] = None
+        self._finish_notified: Set[str] = set()
+
+        # measures queued but not yet finished, and running totals over all measures
+        self._in_flight: Dict[str, "Measure"] = {}
+        self._unfinished_count: int = len(measures)
+        self._not_success_count: int = len(measures)
+
+        # players other than the conductor's allhosts player; see _remote_players()
+        self._remote_players_cache: Optional[Tuple["Player", ...]] = None
+        self._host_totals_cache: Optional[Dict[str, Any]] = None
+
     def __repr__(self) -> str:
         return (
             f"{self.__class__.__name__}(name={self.name},version={self.version},"
@@ -193,7 +240,7 @@ class Score(object):
     def dump(
         self, exclude_local: bool = True, yaml_fields_only: bool = True
     ) -> Dict[str, Any]:
-        data = ScoreSchema().dump(self)
+        data = _SCORE_SCHEMA.dump(self)
 
         if exclude_local:
             # remove local player
@@ -202,40 +249,69 @@ class Score(object):
             except KeyError:
                 pass
 
-            local_measure_names = [x["name"] for x in conductor_local_measure_dicts]
-            to_remove = []
+            # remove local measures and dependencies on them
+            data["measures"] = [
+                m for m in data["measures"] if m["name"] not in _LOCAL_MEASURE_NAMES
+            ]
             for m in data["measures"]:
-                # remove local measure dependencies
-                for local_name in local_measure_names:
-                    if local_name in m["depends_on"]:
-                        m["depends_on"].remove(local_name)
-                # find local measures to remove
-                if m["name"] in local_measure_names:
-                    to_remove.append(m)
-            # actually remove the measures (no modify while iterating)
-            for m in to_remove:
-                data["measures"].remove(m)
+                m["depends_on"] = [
+                    d for d in m["depends_on"] if d not in _LOCAL_MEASURE_NAMES
+                ]
 
         if yaml_fields_only:
             # remove score-level fields
-            dump_only_fields = []
-            for k, v in ScoreSchema().fields.items():
-                if "dump_only=True" in str(v):
-                    dump_only_fields.append(k)
-            for f in dump_only_fields:
+            for f in _SCORE_DUMP_ONLY_FIELDS:
                 del data[f]
 
             # remove measure-level fields
-            dump_only_fields = []
-            for k, v in MeasureSchema().fields.items():
-                if "dump_only=True" in str(v):
-                    dump_only_fields.append(k)
             for m in data["measures"]:
-                for f in dump_only_fields:
+                for f in _MEASURE_DUMP_ONLY_FIELDS:
                     del m[f]
 
         return data
 
+    def to_status_dict(self) -> Dict[str, Any]:
+        # same output as dump() with its defaults, built by attribute access; the
+        # schema walk is comparatively slow and these fields are all primitives
+        players = {
+            p.name: {
+                "name": p.name,
+                "image": p.image,
+                config.PLAYER_HOSTS_DUMP_KEY: list(p.hostnames),
+                "scale": p.scale,
+            }
+            for p in self._remote_players()
+        }
+        measures = [
+            {
+                "name": m.name,
+                "players": list(m.player_names),
+                "task": m.task_name,
+                "args": list(m.args),
+                "store_as": m.store_as,
+                "store_singleton": m.store_singleton,
+                "store_interim_results": m.store_interim_results,
+                "lazy_fetch_stored": m.lazy_fetch_stored,
+                "start_delay": m.start_delay,
+                "depends_on": [
+                    d for d in m.depends_on if d not in _LOCAL_MEASURE_NAMES
+                ],
+                "dependency_proof": m.dependency_proof,
+            }
+            for m in self.measures
+            if m.name not in _LOCAL_MEASURE_NAMES
+        ]
+        return {
+            "name": self.name,
+            "version": self.version,
+            "category": self.category,
+            "description": self.description,
+            "players": players,
+            "measures": measures,
+            "create_hosts": self.create_hosts,
+            "discard_hosts": self.discard_hosts,
+        }
+
     def get_status(self, short: bool = False) -> Dict[str, Any]:
         status = {"state": self.state, "finished": self.finished}
         if self.status or not short:
@@ -260,7 +336,14 @@ class Score(object):
 
         return status
 
+    def invalidate_host_totals(self) -> None:
+        # call whenever measures, their players, or player scales change
+        self._host_totals_cache = None
+
     def get_host_totals(self) -> Dict[str, Any]:
+        if self._host_totals_cache is not None:
+            return self._host_totals_cache
+
         ret = {"total": 0}
         for m in self.measures:
             ret[m.name] = {}
@@ -271,36 +354,45 @@ class Score(object):
                 ret[m.name][p.name] = subtotal
                 ret[m.name]["total"] += subtotal
                 ret["total"] += subtotal
+
+        self._host_totals_cache = ret
         return ret
 
+    def _remote_players(self) -> Tuple["Player", ...]:
+        if self._remote_players_cache is None:
+            self._remote_players_cache = tuple(
+                p
+                for p in self.players.values()
+                if p.name != config.CONDUCTOR_ALLHOSTS_PLAYER_NAME
+            )
+        return self._remote_players_cache
+
     def get_measure(self, name: str) -> Optional["Measure"]:
-        for m in self.measures:
-            if m.name == name:
-                return m
-        return None
+        return self._measures_by_name.get(name)
 
     # param taken_hostnames should be supplied by host_control.get_host_names()
     def map_missing_hosts(self, taken_hostnames: List[str]) -> None:
+        taken = set(taken_hostnames)
         for player in self.players.values():
             count = player.scale - len(player.hostnames)
             for _ in range(count):
-                hostname = f"{player.name}_{str(uuid4())[:6]}"
-                while hostname in taken_hostnames:  # no duplicates
-                    hostname = f"{player.name}_{str(uuid4())[:6]}"
+                hostname = f"{player.name}_{secrets.token_hex(3)}"
+                while hostname in taken:  # no duplicates
+                    hostname = f"{player.name}_{secrets.token_hex(3)}"
                 player.hostnames.append(hostname)
-                taken_hostnames.append(hostname)
+                taken.add(hostname)
 
         return
 
     def queue_measure(self, measure: "Measure") -> None:
         measure.state = TaskState.QUEUED
+        measure.queued = True
+        self._in_flight[measure.name] = measure
         logger.debug(f"Queueing measure {measure.name}")
         for player_name in measure.player_names:
-            task = asyncio.ensure_future(
-                self.play_the_player(measure, self.players[player_name])
-            )
+            # wrap_future awaits the coroutine directly; one Task per player suffices
             task = wrap_future(
-                task,
+                self.play_the_player(measure, self.players[player_name]),
                 f"{self.name}.{player_name}.{measure.name}",
                 None,
                 score_or_measure=measure,
@@ -310,9 +402,7 @@ class Score(object):
     def get_all_hosts(self) -> Tuple[Set["Host"], List[str]]:
         all_hosts = set()
         error_msgs = []
-        for p in self.players.values():
-            if p.name == config.CONDUCTOR_ALLHOSTS_PLAYER_NAME:
-                continue
+        for p in self._remote_players():
             for hostname in p.hostnames:
                 if hostname not in hosts:
                     error_msgs.append(f"host '{hostname}' not found in orchestra")
@@ -323,109 +413,137 @@ class Score(object):
         return all_hosts, error_msgs
 
     def evaluate_state(self) -> None:
-        # make sure we are current on measure state
-        for m in self.measures:
+        # only measures that have been queued and not yet finished can change state;
+        # everything else is accounted for by the counters in _notify_finished
+        state_priority = task_state_priority(self.state)
+        for m in list(self._in_flight.values()):
             if not m.finished:
                 m.evaluate_state(self)
+            if m.finished:
+                del self._in_flight[m.name]
+                self._notify_finished(m)
 
-        not_success = 0
-        unfinished = 0
-        for m in self.measures:
-            if not m.finished:
-                unfinished += 1
-            if m.state is not TaskState.SUCCESS:
-                not_success += 1
-
-            if task_state_priority(m.state) > task_state_priority(self.state):
+            m_priority = task_state_priority(m.state)
+            if m_priority > state_priority:
                 self.state = m.state
+                state_priority = m_priority
 
-            if m.status:
-
-                # replace task id with host name if known
-                status_copy = copy.copy(m.status)
-                for player_name, player_status in m.status.items():
-                    new_player_status = {}
-                    for task_id, status in player_status.items():
-                        if task_id in self.task_map:
-                            tmi = self.task_map[task_id]
-                            new_player_status[tmi["host_name"]] = status
-                        else:
-                            new_player_status[task_id] = status
-                    status_copy[player_name] = new_player_status
-
-                self.status[m.name] = status_copy
+            self._update_measure_status(m)
 
-        if not_success == 0:
+        if self._not_success_count == 0:
             self.state = TaskState.SUCCESS
 
-        if unfinished == 0:
+        if self._unfinished_count == 0:
             self.finished = True
             self.finished_at = datetime.utcnow()
             msg = f"finished with state {self.state}"
             logger.info(gudlog(msg, self))
 
-    def smart_queue(self, unqueued_measures: List["Measure"]) -> Optional["Measure"]:
-        to_queue = (
-            None  # queue one at a time to ensure we catch any dependency failures
-        )
-        dependency_failed = []
-        for m in unqueued_measures:
-            # no dependencies
-            if not m.depends_on:
-                to_queue = m
-                break
-            else:
-                # make sure dependencies finished before queueing
-                # also if any dependencies failed, dependent measures fail too
-                ready_to_queue = True  # until/unless False below
-
-                for dep_name in m.depends_on:
-                    depm = self.get_measure(dep_name)
-                    if not depm.finished:
-                        ready_to_queue = False
-                        m.state = TaskState.DEFERRED
-
-                    if depm.state == TaskState.FAILURE and not m.dependency_proof:
-                        ready_to_queue = False
-                        m.state = TaskState.FAILURE
-                        m.finished = True
-                        m.status["all"]["all"] = f"dependency failed ({dep_name})"
-                        dependency_failed.append(m)
-
-                if ready_to_queue:
-                    to_queue = m
-                    break
-
-        if to_queue is not None:
-            self.queue_measure(to_queue)
-            if to_queue in unqueued_measures:
-                unqueued_measures.remove(to_queue)
-
-        for to_remove in dependency_failed:
-            msg = (
-                f"measure '{to_remove.name}' failed because one or more of its"
-                " dependencies failed"
-            )
-            logger.warning(gudlog(msg, self))
-            if to_remove in unqueued_measures:
-                unqueued_measures.remove(to_remove)
+    def _update_measure_status(self, m: "Measure") -> None:
+        if m.status and (m.status_dirty or m.name not in self.status):
+            # replace task id with host name if known
+            task_map = self.task_map
+            self.status[m.name] = {
+                player_name: {
+                    (
+                        task_map[task_id]["host_name"]
+                        if task_id in task_map
+                        else task_id
+                    ): status
+                    for task_id, status in player_status.items()
+                }
+                for player_name, player_status in m.status.items()
+            }
+            m.status_dirty = False
+
+    def _build_dag(self) -> None:
+        self._dependents = {m.name: [] for m in self.measures}
+        self._remaining_deps = {}
+        for m in self.measures:
+            self._remaining_deps[m.name] = len(m.depends_on)
+            for dep_name in m.depends_on:
+                self._dependents[dep_name].append(m)
+
+        # topological order (Kahn); measures in a dependency cycle are left out
+        in_degree = dict(self._remaining_deps)
+        order = [m for m in self.measures if in_degree[m.name] == 0]
+        for m in order:  # appended to while iterating
+            for child in self._dependents[m.name]:
+                in_degree[child.name] -= 1
+                if in_degree[child.name] == 0:
+                    order.append(child)
+
+        # priority is the length of the longest dependency chain below a measure,
+        # so that measures on the critical path are dispatched first
+        self._priority = {m.name: 0 for m in self.measures}
+        for m in reversed(order):
+            children = self._dependents[m.name]
+            if children:
+                self._priority[m.name] = 1 + max(
+                    self._priority[c.name] for c in children
+                )
 
-        return to_queue
+    def _by_priority(self, measures: List["Measure"]) -> List["Measure"]:
+        # stable, so measures of equal priority keep their score order
+        return sorted(measures, key=lambda m: -self._priority.get(m.name, 0))
+
+    def _notify_finished(self, measure: "Measure") -> None:
+        if self._completion_queue is None or measure.name in self._finish_notified:
+            return
+        self._finish_notified.add(measure.name)
+        self._unfinished_count -= 1
+        if measure.state is TaskState.SUCCESS:
+            self._not_success_count -= 1
+        self._completion_queue.put_nowait(measure)
+
+    def _release_dependents(self, finished_measure: "Measure") -> List["Measure"]:
+        # a dependency finished; return dependents that are now ready and fail those
+        # that cannot run because of it
+        ready = []
+        for m in self._dependents[finished_measure.name]:
+            if m.finished:
+                continue
+
+            self._remaining_deps[m.name] -= 1
+            if finished_measure.state == TaskState.FAILURE and not m.dependency_proof:
+                m.state = TaskState.FAILURE
+                m.finished = True
+                m.status["all"]["all"] = f"dependency failed ({finished_measure.name})"
+                m.status_dirty = True
+                msg = (
+                    f"measure '{m.name}' failed because one or more of its"
+                    " dependencies failed"
+                )
+                logger.warning(gudlog(msg, self))
+                self._update_measure_status(m)
+                self._notify_finished(m)
+            elif self._remaining_deps[m.name] == 0 and not m.queued:
+                # (a measure may already have been played manually)
+                ready.append(m)
+
+        return ready
+
+    def _drain_ready(self) -> List["Measure"]:
+        # process every completion seen so far (including cascading dependency
+        # failures) before anything is dispatched
+        ready = []
+        while not self._completion_queue.empty():
+            ready += self._release_dependents(self._completion_queue.get_nowait())
+        return ready
 
     async def play(self) -> None:
         # add local measures
         for md in conductor_local_measure_dicts:
-            if md["name"] not in [
-                x.name for x in self.measures
-            ]:  # make sure it's not already there
-                local_measure: "Measure" = MeasureSchema().load(md)
+            # make sure it's not already there
+            if md["name"] not in self._measures_by_name:
+                local_measure: "Measure" = _MEASURE_SCHEMA.load(md)
                 local_measure.local_measure = True
                 self.measures.insert(0, local_measure)
+                self._measures_by_name[local_measure.name] = local_measure
 
         # add local measure dependencies
-        local_measure_names = [x["name"] for x in conductor_local_measure_dicts]
         for m in self.measures:
-            if m.name in local_measure_names:
+            if m.name in _LOCAL_MEASURE_NAMES:
                 continue
 
             if "tune_orchestra" not in m.depends_on and m.name != "tune_orchestra":
@@ -435,10 +553,14 @@ class Score(object):
 
         # add conductor allhosts player
         if config.CONDUCTOR_ALLHOSTS_PLAYER_NAME not in self.players.keys():
-            local_player: "Player" = PlayerSchema().load(
+            local_player: "Player" = _PLAYER_SCHEMA.load(
                 {"name": config.CONDUCTOR_ALLHOSTS_PLAYER_NAME}
             )
             self.players[config.CONDUCTOR_ALLHOSTS_PLAYER_NAME] = local_player
+            self._remote_players_cache = None
+
+        # local measures (and possibly the conductor player) were just added
+        self.invalidate_host_totals()
 
         # conductor player will operate over all hosts, including those not created yet
         all_hosts, err_msgs = self.get_all_hosts()
@@ -448,21 +570,40 @@ class Score(object):
             h.name for h in all_hosts
         ]
 
-        # make johann tarball in prep for tuning
-        create_johann_tarball()
-
+        # mark the score started before yielding to the event loop, so that it is
+        # seen as playing while the tarball is built
         self.state = TaskState.STARTED
         self.started_at = datetime.utcnow()
         # self.started_at = datetime.now(tz=pytz.utc)
 
-        unqueued_measures = copy.copy(self.measures)
+        # make johann tarball in prep for tuning
+        await _create_johann_tarball()
+
+        self._build_dag()
+        self._completion_queue = asyncio.Queue()
+        self._finish_notified = set()
+        self._unfinished_count = len(self.measures)
+        self._not_success_count = len(self.measures)
+        ready = []
+        for m in self.measures:
+            if m.depends_on:
+                m.state = TaskState.DEFERRED
+            else:
+                ready.append(m)
+        for m in self._by_priority(ready):
+            self.queue_measure(m)
+
+        # Celery results can only be polled, so measure state is re-evaluated every
+        # second; dependents are queued as soon as a completion is observed
         while True:
             self.evaluate_state()
 
             if self.finished:
                 break
 
-            self.smart_queue(unqueued_measures)
+            # dispatch all measures that became ready at once, critical path first
+            for m in self._by_priority(self._drain_ready()):
+                self.queue_measure(m)
 
             await asyncio.sleep(1)
 
@@ -473,122 +614,51 @@ class Score(object):
         subsubkey: str = None,
         subsubsubkey: str = None,
     ) -> Tuple[bool, Optional[str], int, Any]:
-        # variable name level
         if not key:
             return True, None, 200, self.stored_data
-        elif key in self.stored_data.keys():
-            data = self.stored_data[key]
-            if not subkey:
-                msg = f"fetched stored data key {key} as {data}"
-                return True, msg, 200, data
-            # player name level (if not store_singleton)
-            elif subkey in data:
-                data = data[subkey]
-
-                #  check if iterable
-                try:
-                    iter(data)
-                    iterable = True
-                except TypeError:
-                    iterable = False
-
-                if not subsubkey:
-                    msg = f"fetched stored data key {key}.{subkey} as {data}"
-                    return True, msg, 200, data
-                elif not iterable:
-                    msg = (
-                        f"failed to fetch data subkey {subsubkey} from stored data at"
-                        f" {key}.{subkey} (data not iterable)"
-                    )
-                    return False, msg, 400, None
-                # host name level (if not store_singleton)
-                elif subsubkey in data or (
-                    subsubkey.isdigit() and type(data) in [list, dict]
-                ):
-                    if subsubkey in data:
-                        data = data[subsubkey]
-                    else:  # fetch dictionary value (host) by index
-                        subsubkey = int(subsubkey)
-                        try:
-                            if type(data) is list:
-                                data = data[subsubkey]
-                            else:
-                                data = list(data.values())[subsubkey]
-                        except IndexError:
-                            msg = (
-                                f"failed to fetch data subkey {subsubkey} from stored"
-                                f" data at {key}.{subkey} (index out of bounds)"
-                            )
-                            return False, msg, 400, None
 
-                    # stored data value level
-                    # check if iterable
-                    try:
-                        iter(data)
-                        iterable = True
-                    except TypeError:
-                        iterable = False
+        # levels: variable name, player name (if not store_singleton),
+        # host name (if not store_singleton), stored data value
+        data = self.stored_data
+        path = []
+        for k in (key, subkey, subsubkey, subsubsubkey):
+            if not k:
+                break
 
-                    if not subsubsubkey:
-                        msg = (
-                            f"fetched stored data key {key}.{subkey}.{subsubkey} as"
-                            f" {data}"
-                        )
-                        return True, msg, 200, data
-                    elif not iterable:
-                        msg = (
-                            f"failed to fetch data subkey {subsubsubkey} from stored"
-                            f" data at {key}.{subkey}.{subsubkey} (data not iterable)"
-                        )
-                        return False, msg, 400, None
-                    elif subsubsubkey in data or (
-                        subsubsubkey.isdigit() and type(data) in [list, dict]
-                    ):
-                        if subsubsubkey in data:
-                            data = data[subsubsubkey]
-                            msg = (
-                                "fetched stored data key"
-                                f" {key}.{subkey}.{subsubkey}.{subsubsubkey} as {data}"
-                            )
-                            return True, msg, 200, data
-                        else:
-                            subsubsubkey = int(subsubsubkey)
-                            try:
-                                if type(data) is list:
-                                    data = data[subsubsubkey]
-                                else:
-                                    data = list(data.values())[subsubsubkey]
-                            except IndexError:
-                                msg = (
-                                    f"failed to fetch data subkey {subsubsubkey} from"
-                                    f" stored data at {key}.{subkey}.{subsubkey} (index"
-                                    " out of bounds)"
-                                )
-                                return False, msg, 400, None
-
-                            msg = (
-                                "fetched stored data key"
-                                f" {key}.{subkey}.{subsubkey}.{subsubsubkey} as {data}"
-                            )
-                            return True, msg, 200, data
-                    else:
-                        msg = (
-                            f"failed to fetch data subkey {subsubsubkey} from stored"
-                            f" data at {key}.{subkey}.{subsubkey}"
-                        )
-                        return False, msg, 400, None
-                else:
+            if isinstance(data, dict) and k in data:
+                data = data[k]
+            elif not path:
+                return False, f"failed to fetch stored data key {k}", 400, None
+            elif not isinstance(data, (list, dict)):
+                msg = (
+                    f"failed to fetch data subkey {k} from stored data at"
+                    f" {'.'.join(path)} (data not iterable)"
+                )
+                return False, msg, 400, None
+            elif len(path) >= 2 and k.isdigit():
+                # fetch list item or dictionary value (host) by index
+                index = int(k)
+                if index >= len(data):
                     msg = (
-                        f"failed to fetch data subkey {subsubkey} from stored data at"
-                        f" {key}.{subkey}"
+                        f"failed to fetch data subkey {k} from stored data at"
+                        f" {'.'.join(path)} (index out of bounds)"
                     )
                     return False, msg, 400, None
+                if isinstance(data, list):
+                    data = data[index]
+                else:
+                    data = next(itertools.islice(data.values(), index, index + 1))
             else:
-                msg = f"failed to fetch data subkey {subkey} from stored data at {key}"
+                msg = (
+                    f"failed to fetch data subkey {k} from stored data at"
+                    f" {'.'.join(path)}"
+                )
                 return False, msg, 400, None
-        else:
-            msg = f"failed to fetch stored data key {key}"
-            return False, msg, 400, None
+
+            path.append(k)
+
+        msg = f"fetched stored data key {'.'.join(path)} as {data}"
+        return True, msg, 200, data
 
     def store_results(
         self, measure: "Measure", player_name: Optional[str], results: Dict
@@ -611,8 +681,9 @@ class Score(object):
 
             self.stored_data[key][player_name] = results
 
-            msg = f"Stored {key}[{player_name}]:\n{results}"
-            logger.debug(gudlog(msg, self))
+            if logger.isEnabledFor(logging.DEBUG):
+                msg = f"Stored {key}[{player_name}]:\n{results}"
+                logger.debug(gudlog(msg, self))
         else:
             if self.stored_data[key] and results != self.stored_data[key]:
                 msg = (
@@ -623,8 +694,9 @@ class Score(object):
 
             self.stored_data[key] = results
 
-            msg = f"Stored {key}:\n{results}"
-            logger.debug(gudlog(msg, self))
+            if logger.isEnabledFor(logging.DEBUG):
+                msg = f"Stored {key}:\n{results}"
+                logger.debug(gudlog(msg, self))
 
     # this should run in an executor, as it can block an arbitrarily long time
     async def play_the_player(self, measure: "Measure", player: "Player") -> bool:
@@ -647,13 +719,15 @@ class Score(object):
             measure.state = TaskState.FAILURE
             # we can't set measure.finished yet; other players for this measure may be running
             measure.status["all"]["all"] = f"{msg}; see logs for details"
+            measure.status_dirty = True
             return False
 
         msg = f"queueing measure {measure.name} with a delay of {delay} seconds"
         logger.info(gudlog(msg, self, player))
 
-        msg = f"(transformed) args:\n{pprint.pformat(new_args, indent=4)}"
-        logger.debug(gudlog(msg, self, player, measure))
+        if logger.isEnabledFor(logging.DEBUG):
+            msg = f"(transformed) args:\n{pprint.pformat(new_args, indent=4)}"
+            logger.debug(gudlog(msg, self, player, measure))
 
         success, err_msg, group_task = player.enqueue(
             self, measure, measure.task_name, delay, *new_args
@@ -665,28 +739,43 @@ class Score(object):
             logger.warning(gudlog(msg, self, player))
             measure.state = TaskState.FAILURE
             measure.status[player.name]["all"] = msg
+            measure.status_dirty = True
             return False
 
     def validate_create_host_mappings(self) -> Tuple[bool, List[str]]:
         success = True
         err_msgs = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        external_redis = config.HOST_CONTROL_EXTERNAL_REDIS
+        redis_host_external = config.REDIS_HOST_EXTERNAL
+        # one clock reading per pass, used both to age and to stamp confirmations
+        now = datetime.utcnow()
+        now_mono = time.monotonic()
 
         # map missing (to be created) hostnames to players
         if self.create_hosts:
             self.map_missing_hosts(get_host_names())
 
-        for p in self.players.values():
-            # skip local player
-            if p.name == config.CONDUCTOR_ALLHOSTS_PLAYER_NAME:
-                continue
+        # every control name we may need to probe, so that each host control class
+        # is asked only once (lazily) which of them exist
+        candidate_control_names = set()
+        for p in self._remote_players():
+            for host_name in p.hostnames:
+                control_name = host_name
+                if host_name in hosts:
+                    control_name = hosts[host_name].control_name or host_name
+                candidate_control_names.add(control_name)
+        existing_control_names: Dict[Type["HostControl"], Set[str]] = {}
 
+        for p in self._remote_players():
             # validate hostnames length
             if p.hostnames == [] and not self.create_hosts:
-                msg = f"{p.name}: no hosts mapped"
                 if p.scale == 0 and config.ALLOW_EMPTY_PLAYER_HOSTS:
-                    logger.debug(gudlog(msg, self))
+                    if debug:
+                        logger.debug(gudlog(f"{p.name}: no hosts mapped", self))
                 else:
                     success = False
+                    msg = f"{p.name}: no hosts mapped"
                     logger.warning(gudlog(msg, self))
                     err_msgs.append(msg)
                     continue
@@ -698,6 +787,9 @@ class Score(object):
                 continue
 
             for host_name in p.hostnames:
+                # debug-level events for this host, logged as a single record
+                events = []
+
                 if host_name not in hosts:
                     # create host obj
                     host_dict = {
@@ -705,12 +797,11 @@ class Score(object):
                         "image": p.image,
                     }
                     try:
-                        msg = (
-                            f"Temporarily creating Host object for {host_name} with"
-                            f" image {p.image}"
-                        )
-                        logger.debug(gudlog(msg, self, p))
                         host_obj = HostSchema().load(host_dict)
+                        if debug:
+                            events.append(
+                                f"temporarily created Host object with image {p.image}"
+                            )
                     except MarshmallowValidationError:
                         success = False
                         msg = f"{host_name}: error creating Host object"
@@ -739,7 +830,7 @@ class Score(object):
                     host_obj = hosts[host_name]
 
                 # make sure we have externally-accessible Redis if needed
-                if host_obj.control_method not in config.HOST_CONTROL_EXTERNAL_REDIS:
+                if host_obj.control_method not in external_redis:
                     success = False
                     msg = (
                         f"{host_name}: control_method '{host_obj.control_method}'"
@@ -750,8 +841,7 @@ class Score(object):
                     err_msgs.append(msg)
                     continue
                 elif (
-                    not config.REDIS_HOST_EXTERNAL
-                    and config.HOST_CONTROL_EXTERNAL_REDIS[host_obj.control_method]
+                    not redis_host_external and external_redis[host_obj.control_method]
                 ):
                     success = False
                     msg = (
@@ -781,30 +871,37 @@ class Score(object):
 
                 # check if the host was recently confirmed to be turned on
                 host_recently_confirmed_on = False
-                if host_obj.last_confirmed_on:
-                    check_age = (datetime.utcnow() - host_obj.last_confirmed_on).seconds
-                    if check_age < config.HOST_CONFIRMED_ON_VALID_SECS:
+                if host_obj.last_confirmed_on_mono is not None:
+                    check_age = int(now_mono - host_obj.last_confirmed_on_mono)
+                    if check_age < _HOST_CONFIRMED_VALID:
                         host_recently_confirmed_on = True
-                        msg = (
-                            f"Host '{host_name}' with control_name"
-                            f" '{host_obj.control_name}' confirmed to be on via"
-                            f" {host_obj.control_method} {check_age}s ago; not checking"
-                            " again"
-                        )
-                        logger.debug(msg)
+                        if debug:
+                            events.append(
+                                f"control_name '{host_obj.control_name}' confirmed to"
+                                f" be on via {host_obj.control_method} {check_age}s"
+                                " ago; not checking again"
+                            )
 
                 host_confirmed_on = False
                 if not host_recently_confirmed_on:
                     control_name = host_obj.control_name or host_obj.name
-                    host_confirmed_on = host_control_class.host_exists(control_name)
+                    if control_name in candidate_control_names:
+                        existing = existing_control_names.get(host_control_class)
+                        if existing is None:
+                            existing = host_control_class.list_existing(
+                                candidate_control_names
+                            )
+                            existing_control_names[host_control_class] = existing
+                        host_confirmed_on = control_name in existing
+                    else:
+                        host_confirmed_on = host_control_class.host_exists(control_name)
                     if host_confirmed_on:
-                        host_obj.last_confirmed_on = datetime.utcnow()
-                        msg = (
-                            f"Host '{host_name}' with control_name"
-                            f" '{host_obj.control_name}' appears to exist via"
-                            f" {host_obj.control_method}"
-                        )
-                        logger.debug(msg)
+                        host_obj.mark_confirmed_on(now, now_mono)
+                        if debug:
+                            events.append(
+                                f"control_name '{host_obj.control_name}' appears to"
+                                f" exist via {host_obj.control_method}"
+                            )
 
                 if host_recently_confirmed_on or host_confirmed_on:
                     if (
@@ -829,7 +926,20 @@ class Score(object):
                 else:
                     # mark hosts that need to be created
                     hosts[host_name].pending_create = True
-                    msg = f"host {host_name} marked for creation"
+                    if debug:
+                        events.append("marked for creation")
+
+                if events:
+                    msg = f"host {host_name}: {'; '.join(events)}"
                     logger.debug(gudlog(msg, self, p))
 
         return success, err_msgs
+
+
+def _dump_only_fields(schema: Schema) -> frozenset:
+    return frozenset(f.data_key or k for k, f in schema.fields.items() if f.dump_only)
+
+
+_SCORE_SCHEMA = ScoreSchema()
+_SCORE_DUMP_ONLY_FIELDS = _dump_only_fields(_SCORE_SCHEMA)
+_MEASURE_DUMP_ONLY_FIELDS = _dump_only_fields(_MEASURE_SCHEMA)
@@ -6,7 +6,7 @@ import os
 import socket
 from ipaddress import IPv4Interface
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 from uuid import uuid4
 
 import dotenv
@@ -32,6 +32,9 @@ if TYPE_CHECKING:
 
 _ENV_FILE = os.getenv("JOHANN_ENV_FILE", ".env")
 
+# credentials files already loaded into the environment
+_loaded_creds_files: Set[Path] = set()
+
 
 class JohannConfig(BaseSettings):
     __instance__: "JohannConfig" = None
@@ -85,9 +88,12 @@ class JohannConfig(BaseSettings):
 
     @validator("CREDS_FILE")
     def load_creds_file(cls, v, values):
+        if v in _loaded_creds_files:
+            return v
         try:
             if v.is_file():
                 dotenv.load_dotenv(v)
+                _loaded_creds_files.add(v)
         except Exception:
             raise ValidationError(f"Failed to load CREDS_FILE '{v}'")
         return v
@@ -184,6 +190,9 @@ class JohannConfig(BaseSettings):
     HOST_AUTO_INSTALL: bool = True
     PLAYER_HOSTS_DUMP_KEY: str = "hosts"
     PLUGINS_EXCLUDE: List[str] = []  # PLANNED: this implenentation is still WIP
+    # also find johann_* plugins by scanning sys.path (slow) when some are registered
+    # under the 'johann.plugins' entry point group; without any, the scan always runs
+    PLUGINS_SCAN_PATH: bool = False
 
     # keys should be all upper-case
     HOST_CONTROL_CLASS_NAMES: Dict[str, Optional[str]] = {
@@ -211,7 +220,7 @@ class JohannConfig(BaseSettings):
 
 
 def get_settings() -> JohannConfig:
-    return JohannConfig()
+    return JohannConfig.get_config()
 
 
 config = get_settings()
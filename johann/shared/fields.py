@@ -8,10 +8,14 @@ import marshmallow
 
 from johann.shared.enums import TaskState
 
+_NAME_RE = re.compile(r"[\w\-]+")
+_HOST_NAME_RE = re.compile(r"[\w\-.]+")
+
 
 class NameField(marshmallow.fields.String):
     """A name field."""
 
+    name_re = _NAME_RE
     default_error_messages = {
         "invalid_name": (
             "Names may only consist of letters, numbers, underscores, and hyphens"
@@ -21,7 +25,7 @@ class NameField(marshmallow.fields.String):
     def _validated(self, value: Any) -> Optional[str]:
         if value is None:
             return None
-        if isinstance(value, str) and re.match(r"[\w\-]+", value):
+        if isinstance(value, str) and self.name_re.fullmatch(value):
             return value
         else:
             raise self.make_error("invalid_name")
@@ -30,6 +34,18 @@ class NameField(marshmallow.fields.String):
         return self._validated(value)
 
 
+class HostNameField(NameField):
+    """A host name field; unlike other names, these may contain dots."""
+
+    name_re = _HOST_NAME_RE
+    default_error_messages = {
+        "invalid_name": (
+            "Host names may only consist of letters, numbers, underscores, hyphens,"
+            " and dots"
+        )
+    }
+
+
 class LaxStringField(marshmallow.fields.String):
     """A string field that will attempt to cast non-strings."""
 
@@ -51,10 +67,11 @@ class LaxStringField(marshmallow.fields.String):
 
 class StateField(marshmallow.fields.Field):
     def _serialize(self, value, attr, obj, **kwargs):
-        if type(value) is str:
-            return value
-        else:
+        # TaskState is itself a str, but str() of it gives 'TaskState.X', not the value
+        if isinstance(value, TaskState):
             return value.value
+        else:
+            return value
 
     def _deserialize(self, value, attr, data, **kwargs):
         try:
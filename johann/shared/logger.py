@@ -2,6 +2,8 @@
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
 from logging import Logger
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Tuple
 
 import logzero
 from pydantic import BaseModel, ByteSize
@@ -20,15 +22,38 @@ class LoggerModel(BaseModel):
     format: str = config.LOG_FORMAT
 
 
+# one rotating file handler per log file (and settings), shared by every logger that
+# writes to it; separate handlers would each hold the file open and rotate it
+_file_handlers: Dict[Tuple[str, int, int, int, str], RotatingFileHandler] = {}
+
+
+def _get_file_handler(model: LoggerModel) -> RotatingFileHandler:
+    file_level = model.file_level or model.level
+    key = (model.file, file_level, model.max_bytes, model.backup_count, model.format)
+    handler = _file_handlers.get(key)
+    if handler is None:
+        handler = RotatingFileHandler(
+            filename=model.file,
+            maxBytes=model.max_bytes,
+            backupCount=model.backup_count,
+        )
+        # marked as logzero's own so that setting up the same logger again detaches
+        # it instead of overriding its level and formatter
+        setattr(handler, logzero.LOGZERO_INTERNAL_LOGGER_ATTR, True)
+        handler.setLevel(file_level)
+        handler.setFormatter(logzero.LogFormatter(fmt=model.format))
+        _file_handlers[key] = handler
+
+    return handler
+
+
 class JohannLogger:
     def __init__(self, name, **kwargs):
         self.model = LoggerModel(name=name, **kwargs)
         self.logger: Logger = logzero.setup_logger(
             name=self.model.name,
-            logfile=self.model.file,
             level=self.model.level,
-            maxBytes=self.model.max_bytes,
-            backupCount=self.model.backup_count,
-            fileLoglevel=self.model.file_level,
             formatter=logzero.LogFormatter(fmt=self.model.format),
         )
+        if self.model.file:
+            self.logger.addHandler(_get_file_handler(self.model))
@@ -2,6 +2,7 @@
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
 
+import logging
 import pprint
 import subprocess
 import time
@@ -107,7 +108,8 @@ def run_shell_command(
     exit_code = proc.returncode
     output = proc.stdout
 
-    logger.debug(f"Command output:\n{output}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Command output:\n{output}")
     if exit_code:
         msg = "Non-zero exit code"
         if not allow_errors:
@@ -118,16 +120,20 @@ def run_shell_command(
     return output
 
 
+def _pmtr_send(pmtr_job_name: str, action: str) -> str:
+    # plain function, so in-process callers skip the Celery task wrapper
+    cmd = f"echo -n '{action} {pmtr_job_name}' > /dev/udp/127.0.0.1/31337"
+    return run_shell_command.run(cmd, "bash")
+
+
 @celery_app.task
 def pmtr_enable(pmtr_job_name: str) -> str:
-    cmd = f"echo -n 'enable {pmtr_job_name}' > /dev/udp/127.0.0.1/31337"
-    return run_shell_command(cmd, "bash")
+    return _pmtr_send(pmtr_job_name, "enable")
 
 
 @celery_app.task
 def pmtr_disable(pmtr_job_name: str) -> str:
-    cmd = f"echo -n 'disable {pmtr_job_name}' > /dev/udp/127.0.0.1/31337"
-    return run_shell_command(cmd, "bash")
+    return _pmtr_send(pmtr_job_name, "disable")
 
 
 @celery_app.task(
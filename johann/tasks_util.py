@@ -1,17 +1,20 @@
 # Copyright (c) 2019-present, The Johann Authors. All Rights Reserved.
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
+import logging
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from johann.shared.config import JohannConfig, celery_app
 from johann.shared.enums import TaskState
 from johann.shared.logger import JohannLogger
-from johann.util import get_attr, get_codehash
+from johann.util import get_attr, get_codehash, json_loads
 
 if TYPE_CHECKING:
     from celery import Task
@@ -21,6 +24,16 @@ if TYPE_CHECKING:
 config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
+_CONDUCTOR_URL = f"http://{config.CONDUCTOR_LOCAL_HOST_NAME}:{config.CONDUCTOR_PORT}"
+_STORED_PREFIX = "johann.stored."
+
+# keep-alive connections to the conductor, shared by stored data fetches
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# minimum seconds between PROGRESS state updates from polling tasks
+_PROGRESS_UPDATE_INTERVAL = 1.0
+
 
 # used when you want to retry a Task
 # inherits from BaseException so not caught by 'except Exception'
@@ -48,113 +61,157 @@ def get_hostname(celery_request: "Request") -> Optional[str]:
 def select_random(
     self: "Task", select_from: Union[List, Dict], num_select: int, values_only=False
 ) -> Dict[int, Any]:
-    assert type(select_from) in [list, dict]
-
-    ret = []
-    indexes_used = []
-    rand = random.Random()
-    while len(ret) < num_select:
-        if len(indexes_used) == len(select_from):
-            raise Exception(
-                f"{self.request.shadow}: less than requested {num_select} unique items"
-                " to choose from"
-            )
-
-        index = rand.randint(0, len(select_from) - 1)
-        if index in indexes_used:
-            continue
+    assert isinstance(select_from, (list, dict))
 
-        indexes_used.append(index)
-        item = (
-            list(select_from.values())[index]
-            if type(select_from) is dict
-            else select_from[index]
+    pool = select_from if isinstance(select_from, list) else list(select_from.values())
+    if num_select > len(pool):
+        raise Exception(
+            f"{self.request.shadow}: less than requested {num_select} unique items"
+            " to choose from"
         )
-        if item not in ret:
-            ret.append(item)
+    ret = random.sample(pool, num_select)
 
-    dict_ret = {index: selection for index, selection in enumerate(ret)}
     if num_select == 1:
-        ret = list(dict_ret.values())[0]
+        return ret[0]
     elif values_only:
-        ret = list(dict_ret.values())
+        return ret
     else:
-        ret = dict_ret
+        return dict(enumerate(ret))
 
-    return ret
+
+# rhs is the '<SCORE_NAME>[.<SOMETHING>]' part of 'johann.stored.<SCORE_NAME>...'
+# returns the score name and the four stored data keys ("None" if not given)
+def _parse_stored_keys(rhs: str, arg: str) -> Tuple[str, List[str]]:
+    keyparts = rhs.split(".")
+    if len(keyparts) > 5:
+        raise Exception(f"arg {arg} has too many subkeys")
+    keyparts += ["None"] * (5 - len(keyparts))
+    return keyparts[0], keyparts[1:]
 
 
-# assumes arg is str of form 'johann.stored.<SCORE_NAME>[.<SOMETHING>]'
 # note that the johann conductor will add the <SCORE_NAME> portion for you
 def fetch_stored_data_helper(arg: str) -> Any:
     logger.debug(f"fetching stored_data '{arg}' from conductor")
 
-    keyparts = arg.split("johann.stored.")[1].split(".")
-    if len(keyparts) == 1:
-        key = "None"
-        subkey = "None"
-        subsubkey = "None"
-        subsubsubkey = "None"
-    elif len(keyparts) == 2:
-        key = keyparts[1]
-        subkey = "None"
-        subsubkey = "None"
-        subsubsubkey = "None"
-    elif len(keyparts) == 3:
-        key = keyparts[1]
-        subkey = keyparts[2]
-        subsubkey = "None"
-        subsubsubkey = "None"
-    elif len(keyparts) == 4:
-        key = keyparts[1]
-        subkey = keyparts[2]
-        subsubkey = keyparts[3]
-        subsubsubkey = "None"
-    elif len(keyparts) == 5:
-        key = keyparts[1]
-        subkey = keyparts[2]
-        subsubkey = keyparts[3]
-        subsubsubkey = keyparts[4]
-    else:
-        raise Exception(f"arg {arg} has too many subkeys")
-    rjson = requests.get(
-        f"http://{config.CONDUCTOR_LOCAL_HOST_NAME}:{config.CONDUCTOR_PORT}/scores/"
-        f"{keyparts[0]}/stored_data/{key}/{subkey}/{subsubkey}/{subsubsubkey}"
-    ).json()
+    score_name, keys = _parse_stored_keys(arg.split(_STORED_PREFIX, 1)[1], arg)
+    response = _session.get(
+        f"{_CONDUCTOR_URL}/scores/{score_name}/stored_data/{'/'.join(keys)}",
+        timeout=(3.05, 30),
+    )
+    rjson = json_loads(response.content)
 
     if not rjson["success"]:
         raise Exception(f"failed to fetch value for {arg}:\n{rjson['messages']}")
     else:
         data = rjson["data"]
-        logger.debug(f"fetched {arg} as:\n{data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"fetched {arg} as:\n{data}")
         return data
 
 
+# fetches several 'johann.stored.<SOMETHING>' args with one request per score
+# args maps each arg to its <SOMETHING> part
+def fetch_stored_data_batch(args: Dict[str, str]) -> Dict[str, Any]:
+    by_score: Dict[str, List[Tuple[str, List[str]]]] = {}
+    for arg, rhs in args.items():
+        score_name, keys = _parse_stored_keys(rhs, arg)
+        by_score.setdefault(score_name, []).append((arg, keys))
+
+    ret = {}
+    for score_name, requested in by_score.items():
+        logger.debug(
+            f"fetching {len(requested)} stored_data values for score '{score_name}'"
+            " from conductor"
+        )
+        response = _session.post(
+            f"{_CONDUCTOR_URL}/scores/{score_name}/stored_data",
+            json=[keys for _, keys in requested],
+            timeout=(3.05, 30),
+        )
+        if response.status_code in (404, 405):
+            # conductor predates the batch route (or the score is unknown, which the
+            # individual fetches report properly); fetch individually, in parallel
+            ret.update(_fetch_stored_data_parallel([arg for arg, _ in requested]))
+            continue
+
+        rjson = json_loads(response.content)
+        if not rjson["success"]:
+            raise Exception(
+                f"failed to fetch stored data for score '{score_name}':\n"
+                f"{rjson['messages']}"
+            )
+
+        results = rjson["data"]
+        if len(results) != len(requested):
+            raise Exception(
+                f"conductor returned {len(results)} stored data values for score"
+                f" '{score_name}', but {len(requested)} were requested"
+            )
+
+        for (arg, _), result in zip(requested, results):
+            if not result["success"]:
+                raise Exception(
+                    f"failed to fetch value for {arg}:\n{result['messages']}"
+                )
+            ret[arg] = result["data"]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"fetched {arg} as:\n{result['data']}")
+
+    return ret
+
+
+def _fetch_stored_data_parallel(args: List[str]) -> Dict[str, Any]:
+    if len(args) <= 1:
+        return {arg: fetch_stored_data_helper(arg) for arg in args}
+
+    # the fetches are I/O bound, so threads overlap their round trips
+    with ThreadPoolExecutor(max_workers=min(len(args), 8)) as executor:
+        return dict(zip(args, executor.map(fetch_stored_data_helper, args)))
+
+
 # decorator
 # fetches any 'johann.stored.<SOMETHING>' args or kwargs to func
 def resolve_johann_args(func: Callable) -> Callable:
     @wraps(func)
     def func_wrapper(self, *args: Any, **kwargs: Any) -> Callable:
-        new_args = ()
+        # args may be arbitrarily large; only format them if they will be logged
+        debug = logger.isEnabledFor(logging.DEBUG)
+        stored_args: Dict[str, str] = {}
         for arg in args:
-            if type(arg) is not str or "johann.stored." not in arg:
-                logger.debug(f"ignoring arg {arg}")
-                new_args += (arg,)
-            elif len(arg.split("johann.stored.")) != 2:
+            if not (isinstance(arg, str) and arg.startswith(_STORED_PREFIX)):
+                if debug:
+                    logger.debug(f"ignoring arg {arg}")
+                continue
+            rhs = arg[len(_STORED_PREFIX) :]
+            if _STORED_PREFIX in rhs:
                 raise Exception(f"arg {arg} is malformed")
-            else:
+            if debug:
                 logger.debug(f"fetching arg {arg}")
-                new_args += (fetch_stored_data_helper(arg),)
-        new_kwargs = {}
+            stored_args[arg] = rhs
         for kw, arg in kwargs.items():
-            if type(arg) is not str or "johann.stored." not in arg:
-                logger.debug(f"ignoring kwarg {arg}")
-                new_kwargs[kw] = arg
-            elif len(arg.split("johann.stored.")) != 2:
+            if not (isinstance(arg, str) and arg.startswith(_STORED_PREFIX)):
+                if debug:
+                    logger.debug(f"ignoring kwarg {arg}")
+                continue
+            rhs = arg[len(_STORED_PREFIX) :]
+            if _STORED_PREFIX in rhs:
                 raise Exception(f"kwarg {kw}={arg} is malformed")
-            else:
+            if debug:
                 logger.debug(f"fetching kwarg {arg}")
-                new_kwargs[kw] = fetch_stored_data_helper(arg)
+            stored_args[arg] = rhs
+
+        if not stored_args:
+            return func(self, *args, **kwargs)
+
+        # one round trip for all of them rather than one per arg
+        fetched = fetch_stored_data_batch(stored_args)
+        new_args = tuple(
+            fetched.get(arg, arg) if isinstance(arg, str) else arg for arg in args
+        )
+        new_kwargs = {
+            kw: fetched.get(arg, arg) if isinstance(arg, str) else arg
+            for kw, arg in kwargs.items()
+        }
 
         return func(self, *new_args, **new_kwargs)
 
@@ -173,8 +230,10 @@ def do_until(
 ) -> Dict[str, Any]:
     func = get_func_helper(func_name, self)
 
-    start = time.time()
+    # monotonic, so that wall clock adjustments cannot cut short or extend the loop
+    start = time.monotonic()
     now = start
+    last_update = start
     self.update_state(
         state=TaskState.PROGRESS, meta={"current": now - start, "total": timeout}
     )
@@ -195,15 +254,19 @@ def do_until(
                 "result": result,
             }
         else:
-            now = time.time()
-            self.update_state(
-                state=TaskState.PROGRESS,
-                meta={
-                    "current": now - start,
-                    "total": timeout,
-                    "interim_result": result,
-                },
-            )
+            now = time.monotonic()
+            # each update is a result backend write; with a short interval, limit
+            # them to one per _PROGRESS_UPDATE_INTERVAL
+            if now - last_update >= _PROGRESS_UPDATE_INTERVAL:
+                last_update = now
+                self.update_state(
+                    state=TaskState.PROGRESS,
+                    meta={
+                        "current": now - start,
+                        "total": timeout,
+                        "interim_result": result,
+                    },
+                )
 
     if expected_value is not None:
         msg = (
@@ -247,7 +310,7 @@ def do_on_random_interval(
     if args is None:
         args = ()
 
-    start = time.time()
+    start = time.monotonic()
     now = start
     self.update_state(
         state=TaskState.PROGRESS, meta={"current": now - start, "total": duration}
@@ -264,7 +327,7 @@ def do_on_random_interval(
 
         # result = func(*args, **kwargs)
         result = func(*args)
-        now = time.time()
+        now = time.monotonic()
         self.update_state(
             state=TaskState.PROGRESS, meta={"current": now - start, "total": duration}
         )
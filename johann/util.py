@@ -1,28 +1,46 @@
 # Copyright (c) 2019-present, The Johann Authors. All Rights Reserved.
 # Use of this source code is governed by a BSD-3-clause license that can
 # be found in the LICENSE file. See the AUTHORS file for names of contributors.
+import functools
 import glob
 import hashlib
 import importlib
 import json
+import logging
 import os.path
 import pkgutil
 import random
 import re
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import PurePath
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import aiohttp.web
 import pkg_resources
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
 from johann.shared.config import JohannConfig, active_plugins, celery_app
 from johann.shared.enums import TaskState
 from johann.shared.logger import JohannLogger
 
 if TYPE_CHECKING:
-    from asyncio import Future
     from typing import TypeVar
 
     from celery.result import AsyncResult, GroupResult
@@ -38,32 +56,104 @@ if TYPE_CHECKING:
 config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
+PLUGIN_ENTRY_POINT = "johann.plugins"
+
+_JOHANN_PREFIX = "johann."
+_RX_ARG_TYPE = re.compile(r"johann\.(\w+)")
+# all well-formed special arguments, in one pass; see parse_special_arg
+_RX_SPECIAL = re.compile(
+    r"johann\.(?:"
+    r"(?P<stored>stored)(?P<storedkey>(?:\.\w+(?:-\w+)*)+)"
+    r"|(?P<random>random)\.(?P<lo>\d+)-(?P<hi>\d+)"
+    r")"
+)
+_RX_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9.]+")
+
+
+# per-file digests persisted across processes; see calculate_codehash
+_CODEHASH_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "johann",
+    "codehash.json",
+)
+
+# blake2b personalization (at most 16 bytes) identifying how the codehash is built
+_CODEHASH_SCHEME = b"johann.codehash2"
+
+# read size for hashing files on interpreters without hashlib.file_digest
+_HASH_CHUNK_SIZE = 1 << 20
+
+# successful get_attr() lookups; failures are not cached, as the module may be
+# imported later (e.g. by a plugin)
+_attr_cache: Dict[str, Any] = {}
+
+# get_score_resources() results by score_dir; cleared when plugins are loaded
+_score_resources_cache: Dict[str, Dict[str, List[str]]] = {}
+
+_TASK_STATE_PRIORITY: Dict[str, int] = {
+    state: priority
+    for priority, state in enumerate(
+        [  # low to high
+            TaskState.SUCCESS,
+            TaskState.PENDING,
+            TaskState.DEFERRED,
+            TaskState.QUEUED,
+            TaskState.STARTED,
+            TaskState.PROGRESS,
+            TaskState.RETRY,
+            TaskState.FAILURE,
+        ]
+    )
+}
+
 
 def task_state_priority(state: TaskState) -> int:
+    # TaskState is a str enum, so plain state strings (e.g. from Celery) hash the same
     try:
-        state = TaskState(state)
-    except ValueError:
+        return _TASK_STATE_PRIORITY[state]
+    except (KeyError, TypeError):
         msg = f"{state} is not a valid TaskState"
         logger.error(msg)
-        raise
+        raise ValueError(msg)
 
-    sorted_pri = [  # low to high
-        TaskState.SUCCESS,
-        TaskState.PENDING,
-        TaskState.DEFERRED,
-        TaskState.QUEUED,
-        TaskState.STARTED,
-        TaskState.PROGRESS,
-        TaskState.RETRY,
-        TaskState.FAILURE,
-    ]
 
-    try:
-        return sorted_pri.index(state)
-    except ValueError:
-        msg = f"{state} is not a valid TaskState"
-        logger.exception(msg)
-        raise
+def json_dumps(data: Any, sort_keys: bool = False) -> str:
+    """Serializes data to a JSON string, using orjson when it is installed.
+
+    Args:
+        data: The object to serialize.
+        sort_keys: Optional; Sort dictionary keys. Defaults to False.
+
+    Returns:
+        The JSON string.
+
+    Raises:
+        TypeError: data contains a value that is not JSON serializable.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:  # e.g. integers wider than 64 bits
+            pass
+    # compact separators, to match orjson
+    return json.dumps(data, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Deserializes a JSON document, using orjson when it is installed.
+
+    Args:
+        data: The JSON document, e.g. the body of an HTTP response.
+
+    Returns:
+        The deserialized object.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
 def get_codehash() -> str:
@@ -137,14 +227,11 @@ def _get_score_str_helper(
 
     # try to read score with .yml and .yaml extensions
     try:
-        score_path = f"{score_dir}/{score_name}.yml"
-        return pkg_resources.resource_string(package_name, score_path)
-    except FileNotFoundError:
-        try:
-            score_path = f"{score_dir}/{score_name}.yaml"
-            return pkg_resources.resource_string(package_name, score_path)
-        except FileNotFoundError:
-            logger.debug(f"'{score_name}' not found in '{score_dir}' of {package_name}")
+        for ext in ("yml", "yaml"):
+            score_path = f"{score_dir}/{score_name}.{ext}"
+            if pkg_resources.resource_exists(package_name, score_path):
+                return pkg_resources.resource_string(package_name, score_path)
+        logger.debug(f"'{score_name}' not found in '{score_dir}' of {package_name}")
     except Exception:
         if not suppress_warnings:
             logger.warning(
@@ -153,33 +240,125 @@ def _get_score_str_helper(
         return None
 
 
+def _hash_file(filename: str) -> str:
+    """Returns the hex SHA-256 digest of a file, reading it in chunks.
+
+    Args:
+        filename: Path of the file to hash.
+
+    Raises:
+        OSError: The file could not be opened or read.
+    """
+    if hasattr(hashlib, "file_digest"):  # Python 3.11+
+        with open(filename, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    # unbuffered reads into one reused buffer, so no bytes object per chunk
+    filehash = hashlib.sha256()
+    buf = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(filename, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            filehash.update(view[:n])
+    return filehash.hexdigest()
+
+
+@functools.lru_cache(maxsize=4096)
+def _hash_file_cached(filename: str, mtime_ns: int, size: int) -> str:
+    # keyed on stat results so that unchanged files are not re-read
+    return _hash_file(filename)
+
+
+def _hash_one_file(filename: str, mtime_ns: int, size: int) -> Optional[str]:
+    try:
+        filehash = _hash_file_cached(filename, mtime_ns, size)
+    except OSError as e:
+        logger.warning(f"Error while getting codehash ('{filename}'): {e.strerror}")
+        return None
+    logger.debug("%s %s", filehash, filename)
+    return filehash
+
+
+def _load_codehash_cache() -> Dict[str, List]:
+    # {<absolute path>: [mtime_ns, size, sha256 hexdigest]}
+    try:
+        with open(_CODEHASH_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_codehash_cache(cache: Dict[str, List]) -> None:
+    tmp_file = f"{_CODEHASH_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(_CODEHASH_CACHE_FILE), exist_ok=True)
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, _CODEHASH_CACHE_FILE)  # atomic
+    except OSError as e:
+        logger.debug(f"Failed to write codehash cache: {e.strerror}")
+
+
 def calculate_codehash() -> str:
     logger.debug("Getting codehash...")
+    # overlapping patterns (or links) may yield the same file more than once
+    filenames = list(
+        dict.fromkeys(
+            os.path.realpath(f)
+            for p in config.CODEHASH_FILES
+            for f in glob.glob(p, recursive=True)
+        )
+    )
+
+    # reuse digests from previous processes for files whose stat is unchanged
+    disk_cache = _load_codehash_cache()
+    new_cache = {}
     hashes = {}
-    for pathname in config.CODEHASH_FILES:
-        filenames = glob.glob(pathname)
-        for filename in filenames:
-            try:
-                with open(filename, "rb") as f:
-                    filehash = hashlib.sha256()
-                    filehash.update(f.read())
-                    filehash = filehash.hexdigest()
-                    logger.debug(f"{filehash} {filename}")
+    to_hash = []
+    for filename in filenames:
+        try:
+            st = os.stat(filename)
+        except OSError as e:
+            logger.warning(f"Error while getting codehash ('{filename}'): {e.strerror}")
+            continue
+        cached = disk_cache.get(filename)
+        if cached and cached[:2] == [st.st_mtime_ns, st.st_size]:
+            hashes[filename] = cached[2]
+            new_cache[filename] = cached
+        else:
+            to_hash.append((filename, st.st_mtime_ns, st.st_size))
+
+    if to_hash:
+        # files are independent and hashing releases the GIL, so hash them in
+        # parallel; hashlib only releases it for updates of more than ~2 KiB, which
+        # file_digest's buffer and _HASH_CHUNK_SIZE both exceed
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(to_hash))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            filehashes = executor.map(_hash_one_file, *zip(*to_hash))
+            for (filename, mtime_ns, size), filehash in zip(to_hash, filehashes):
+                if filehash is not None:
                     hashes[filename] = filehash
-            except OSError as e:
-                logger.warning(
-                    f"Error while getting codehash ('{filename}'): {e.strerror}"
-                )
-                continue
-    codehash = hashlib.sha256()
-    codehash.update(json.dumps(sorted(list(hashes.values()))).encode("utf-8"))
+                    new_cache[filename] = [mtime_ns, size, filehash]
+
+    if new_cache != disk_cache:
+        _save_codehash_cache(new_cache)
+
+    # digest_size=32 keeps the codehash the same length as the former sha256 one;
+    # person namespaces it, and should change whenever the scheme below does
+    codehash = hashlib.blake2b(digest_size=32, person=_CODEHASH_SCHEME)
+    for filehash in sorted(hashes.values()):
+        codehash.update(bytes.fromhex(filehash))
     codehash = codehash.hexdigest()
     logger.debug(f"Codehash: {codehash}")
     return codehash
 
 
 async def wrap_future(
-    fut: "Future",
+    fut: Awaitable,
     future_name: str,
     callback: Optional[Callable],
     *callback_args: Any,
@@ -192,14 +371,12 @@ async def wrap_future(
         if callback:
             try:
                 callback_result = await callback(result, *callback_args)
-                logger.debug(f"{future_name}| callback result: {callback_result}")
+                logger.debug("%s| callback result: %s", future_name, callback_result)
             except Exception as e:
-                msg = f"{future_name}| callback raised an exception: {str(e)}"
-                logger.exception(msg)
+                logger.exception("%s| callback raised an exception: %s", future_name, e)
         return result
     except Exception as e:
-        msg = f"{future_name}| raised an exception: {str(e)}"
-        logger.exception(msg)
+        logger.exception("%s| raised an exception: %s", future_name, e)
 
         if score_or_measure is not None:
             score_or_measure.state = TaskState.FAILURE
@@ -208,8 +385,10 @@ async def wrap_future(
         return None
 
 
+@functools.lru_cache(maxsize=1024)
 def safe_name(value: str) -> str:
-    return pkg_resources.to_filename(pkg_resources.safe_name(value))
+    # same as pkg_resources.to_filename(pkg_resources.safe_name(value))
+    return _RX_UNSAFE_NAME_CHARS.sub("_", value)
 
 
 def gudexc(
@@ -236,40 +415,43 @@ def gudlog(
     return f"{prefix}| {msg}"
 
 
+class LazyGudlog(object):
+    """Defers gudlog() formatting until a handler actually emits the log record.
+
+    Example: logger.warning(LazyGudlog(msg, score, player))
+    """
+
+    __slots__ = ("args",)
+
+    def __init__(
+        self,
+        msg: str,
+        score: Union["Score", str, None] = None,
+        player: Union["Player", str, None] = None,
+        measure: Union["Measure", str, None] = None,
+        host: Union["Host", str, None] = None,
+    ) -> None:
+        self.args = (msg, score, player, measure, host)
+
+    def __str__(self) -> str:
+        return gudlog(*self.args)
+
+
 def gudprefix(
     score: Union["Score", str, None] = None,
     player: Union["Player", str, None] = None,
     measure: Union["Measure", str, None] = None,
     host: Union["Host", str, None] = None,
 ) -> str:
-    prefix = ""
-    if score:
-        if isinstance(score, str):
-            prefix += f".{score}"
-        else:
-            prefix += f".{score.name}"
-    if measure:
-        if isinstance(measure, str):
-            prefix += f".{measure}"
-        else:
-            prefix += f".{measure.name}"
-    if player:
-        if isinstance(player, str):
-            prefix += f".{player}"
-        else:
-            prefix += f".{player.name}"
-    if host:
-        if isinstance(host, str):
-            prefix += f".{host}"
-        else:
-            prefix += f".{host.name}"
-
-    if not prefix:
-        prefix = "?"
-    elif prefix and prefix[0] == ".":
-        prefix = prefix[1:]
+    if not (score or measure or player or host):
+        return "?"
 
-    return prefix
+    parts = [
+        obj if isinstance(obj, str) else obj.name
+        for obj in (score, measure, player, host)
+        if obj
+    ]
+    return ".".join(parts)
 
 
 def celery_group_status(group_result: "GroupResult", short: bool = False) -> Dict:
@@ -279,7 +461,7 @@ def celery_group_status(group_result: "GroupResult", short: bool = False) -> Dic
         return ret
 
     ret["id"] = group_result.id
-    ret["state"] = TaskState.PENDING  # will change below
+    ret["state"] = TaskState.PENDING  # set below
     ret["finished"] = group_result.ready()
     ret["completed_count"] = group_result.completed_count()
     ret["failed_count"] = 0
@@ -287,30 +469,30 @@ def celery_group_status(group_result: "GroupResult", short: bool = False) -> Dic
 
     progress_current = 0
     tasks = {}
-    for task in group_result.children:
+    children = group_result.children
+    group_state = TaskState.PENDING
+    group_priority = task_state_priority(group_state)
+    for task in children:
         task_status = celery_task_status(task, short=short)
+        state = task_status["state"]
 
         # update overall state
-        if task_state_priority(task_status["state"]) > task_state_priority(
-            ret["state"]
-        ):
-            ret["state"] = task_status["state"]
+        task_priority = task_state_priority(state)
+        if task_priority > group_priority:
+            group_state = state
+            group_priority = task_priority
 
-        if task_status["state"] == TaskState.FAILURE:
+        if state == TaskState.FAILURE:
             ret["failed_count"] += 1
             if "status" in task_status:
                 ret["status"][task.task_id] = task_status["status"]
-        elif task_status["state"] == TaskState.SUCCESS:
+        elif state == TaskState.SUCCESS:
             progress_current += 1
-        elif task_status["state"] == TaskState.PROGRESS:
-            if (
-                "meta" in task_status
-                and task_status["meta"]
-                and "current" in task_status["meta"]
-                and "total" in task_status["meta"]
-            ):
-                c = task_status["meta"]["current"]
-                t = task_status["meta"]["total"]
+        elif state == TaskState.PROGRESS:
+            meta = task_status.get("meta") or {}
+            c = meta.get("current")
+            t = meta.get("total")
+            if c is not None and t:
                 cur_fraction = c / t
                 if cur_fraction > 1:
                     logger.warning(
@@ -327,14 +509,16 @@ def celery_group_status(group_result: "GroupResult", short: bool = False) -> Dic
 
         tasks[task.task_id] = task_status
 
-    if len(group_result.children) == 0:
+    ret["state"] = group_state
+
+    if len(children) == 0:
         normalized_progress = 0
     else:
-        normalized_progress = progress_current / len(group_result.children)
+        normalized_progress = progress_current / len(children)
 
     if group_result.successful():
         ret["state"] = TaskState.SUCCESS
-        normalized_progress = len(group_result.children)
+        normalized_progress = len(children)
 
     if not short:
         ret["meta"] = {
@@ -346,9 +530,12 @@ def celery_group_status(group_result: "GroupResult", short: bool = False) -> Dic
 
 
 def celery_task_status(task: "AsyncResult", short: bool = False) -> Dict:
-    task_status = {"name": task.name, "state": task.status, "meta": {}}
+    # until a task is finished, every access to its state, result, retries, etc.
+    # is another round trip to the result backend; so read the state just once
+    state = task.state
+    task_status = {"name": task.name, "state": state, "meta": {}}
 
-    if task.status == TaskState.FAILURE:
+    if state == TaskState.FAILURE:
         # task.result is probably an exception
         task_status["traceback"] = task.traceback
         if isinstance(task.result, BaseException):
@@ -357,18 +544,24 @@ def celery_task_status(task: "AsyncResult", short: bool = False) -> Dict:
             task_status["status"] = f"Exception ({exc_type_str}): {str(task.result)}"
         else:
             task_status["status"] = str(task.result)
-    elif task.status == TaskState.SUCCESS:
+    elif state == TaskState.SUCCESS:
         task_status["result"] = task.result
-    elif task.status == TaskState.PROGRESS:
+    elif state == TaskState.PROGRESS:
         task_status["meta"] = task.result
     else:
         pass
 
     if not short:
-        task_status["retries"] = task.retries
+        if state == TaskState.PENDING:
+            # nothing has been stored for the task yet
+            task_status["retries"] = None
+        else:
+            task_status["retries"] = task.retries
         task_status["id"] = task.task_id
-        if task.date_done is not None:
-            task_status["finished_at"] = task.date_done.isoformat()
+        # only finished tasks have a date_done
+        if state in (TaskState.SUCCESS, TaskState.FAILURE):
+            if task.date_done is not None:
+                task_status["finished_at"] = task.date_done.isoformat()
 
     return task_status
 
@@ -376,13 +569,26 @@ def celery_task_status(task: "AsyncResult", short: bool = False) -> Dict:
 def create_johann_tarball() -> bool:
     codehash = get_codehash()
     tarball_name = f"johann.{codehash}.tar.gz"
+    tarball_path = os.path.join(str(config.TARBALL_PATH), tarball_name)
+
+    # write under a temporary name, so that an interrupted run can't leave behind
+    # a partial tarball under the real name for players to fetch
+    tmp_tarball_name = f"{tarball_name}.{os.getpid()}.tmp"
+
+    # pigz compresses on all cores and writes plain gzip, so players are unaffected
+    if shutil.which("pigz"):
+        compress_args = [f"--use-compress-program=pigz -p {os.cpu_count() or 1}"]
+    else:
+        compress_args = ["-z"]
+
     tarball_process = subprocess.run(
         [
             "tar",
             "-C",
             str(config.SRC_ROOT),
-            "-czf",
-            tarball_name,
+            *compress_args,
+            "-cf",
+            tmp_tarball_name,
             "--exclude=__pycache__",
             "--exclude=scores",
             "--exclude=minirepo*",
@@ -393,47 +599,72 @@ def create_johann_tarball() -> bool:
         cwd=str(config.TARBALL_PATH),
     )
 
+    tmp_tarball_path = os.path.join(str(config.TARBALL_PATH), tmp_tarball_name)
     if tarball_process.returncode != 0:
         logger.warning(
             f"Failed to create tarball for current code: {str(tarball_process.stderr)}"
         )
+        try:
+            os.remove(tmp_tarball_path)
+        except OSError:
+            pass
         return False
     else:
+        os.replace(tmp_tarball_path, tarball_path)
         logger.debug(f"Successfully created Johann tarball {tarball_name}")
         return True
 
 
 def py_to_clistr(script_str: str) -> str:
-    exec_str = "exec(%r)" % re.sub("\r\n|\r", "\n", script_str.rstrip())
-    return '"%s"' % exec_str.replace('"', r"\"")
+    script_str = script_str.rstrip().replace("\r\n", "\n").replace("\r", "\n")
+    exec_str = f"exec({script_str!r})".replace('"', r"\"")
+    return f'"{exec_str}"'
 
 
 def get_attr(attr_name: str) -> Tuple[Any, Optional[str]]:
-    try:
-        module_name, attribute = attr_name.rsplit(".", 1)
-    except ValueError:
+    if attr_name in _attr_cache:
+        return _attr_cache[attr_name], None
+
+    module_name, _, attribute = attr_name.rpartition(".")
+    if not module_name:
         msg = f"invalid attribute: '{attr_name}'; did you specify a module?"
         return None, msg
 
-    if module_name not in sys.modules:
+    mod = sys.modules.get(module_name)
+    if mod is None:
         msg = f"no such module in current context: '{module_name}'"
         return None, msg
 
-    attr = getattr(sys.modules[module_name], attribute, None)
-
-    if not attr:
+    try:
+        attr = getattr(mod, attribute)
+    except AttributeError:
         msg = f"no such attribute: '{attr_name}'"
         return None, msg
-    else:
-        return attr, None
+
+    _attr_cache[attr_name] = attr
+    return attr, None
+
+
+def _discover_plugin_names() -> List[str]:
+    # plugins registered under the 'johann.plugins' entry point group are found via
+    # the installed distributions' metadata; scanning every module on sys.path for
+    # johann_* packages is slow, so only do it if asked to or if there are none
+    names = [
+        ep.module_name for ep in pkg_resources.iter_entry_points(PLUGIN_ENTRY_POINT)
+    ]
+    if not names or config.PLUGINS_SCAN_PATH:
+        names.extend(
+            name
+            for _, name, _ in pkgutil.iter_modules()
+            if name.startswith("johann_") and name != "johann_main"
+        )
+    return list(dict.fromkeys(names))  # dedupe, keeping order
 
 
 def load_plugins():
     discovered_plugins = []
     exclusions = []
-    for _, name, _ in pkgutil.iter_modules():
-        if not name.startswith("johann_") or name == "johann_main":
-            continue
+    for name in _discover_plugin_names():
         for p in config.PLUGINS_EXCLUDE:
             if str.endswith(name, p):
                 exclusions.append(name)
@@ -448,6 +679,7 @@ def load_plugins():
                 logger.debug(f"Importing {plugin}")
                 importlib.import_module(plugin)
                 active_plugins.append(plugin)
+        _score_resources_cache.clear()
     else:
         logger.info("No plugins found")
 
@@ -457,108 +689,97 @@ def celery_registered_tasks() -> List[str]:
 
 
 # Note: descends recursively into lists and dicts
+def _transform_value(
+    score: "Score", measure: "Measure", player: "Player", a: Any
+) -> Any:
+    if isinstance(a, str):
+        # most strings are ordinary; don't pay for the call to transform_arg
+        if not a.startswith(_JOHANN_PREFIX):
+            return a
+        return transform_arg(score, measure, player, a)
+    elif isinstance(a, list):
+        return transform_args(score, measure, player, a)
+    elif isinstance(a, dict):
+        return {k: _transform_value(score, measure, player, v) for k, v in a.items()}
+    else:
+        return a
+
+
 def transform_args(
     score: "Score", measure: "Measure", player: "Player", args: List
 ) -> List:
-    new_args = []
-    for a in args:
-        if isinstance(a, str):
-            new_arg = transform_arg(score, measure, player, a)
-            new_args.append(new_arg)
-        elif isinstance(a, list):
-            new_arg = transform_args(score, measure, player, a)
-            new_args.append(new_arg)
-        elif isinstance(a, dict):
-            new_arg = {}
-            for k, v in a:
-                new_arg[k] = transform_args(score, measure, player, v)
-            new_args.append(new_arg)
-        else:
-            new_args.append(a)
+    # nothing that could hold a special argument; reuse the list as is
+    if not any(isinstance(a, (str, list, dict)) for a in args):
+        return args
 
-    return new_args
+    return [_transform_value(score, measure, player, a) for a in args]
 
 
-def parse_special_arg(a: str) -> Tuple[str, List[str]]:
+def parse_special_arg(a: str) -> Tuple[str, List[Any]]:
     if not isinstance(a, str):
         raise ValueError("not a string")
 
-    arg_type = re.match(r"johann\.(\w+)", a)
-    stored = re.fullmatch(r"johann\.stored((\.\w+(-\w+)*)+)", a)
-    rand = re.fullmatch(r"johann\.random\.(\d+)-(\d+)", a)
-
-    if not arg_type:
-        raise ValueError("not a special argument")
-    elif arg_type.group(1) not in config.SPECIAL_ARG_TYPES:
-        raise ValueError(f"unrecognized special argument type '{arg_type.group(1)}'")
-    elif stored:
-        keyparts = stored.group(1)[1:].split(".")
-        if len(keyparts) == 1:
-            key = keyparts[0]
-            subkey = None
-            subsubkey = None
-            subsubsubkey = None
-        elif len(keyparts) == 2:
-            key = keyparts[0]
-            subkey = keyparts[1]
-            subsubkey = None
-            subsubsubkey = None
-        elif len(keyparts) == 3:
-            key = keyparts[0]
-            subkey = keyparts[1]
-            subsubkey = keyparts[2]
-            subsubsubkey = None
-        elif len(keyparts) == 4:
-            key = keyparts[0]
-            subkey = keyparts[1]
-            subsubkey = keyparts[2]
-            subsubsubkey = keyparts[3]
+    m = _RX_SPECIAL.fullmatch(a)
+    if m is None:
+        # only malformed arguments get here; work out why for the error message
+        arg_type = _RX_ARG_TYPE.match(a)
+        if not arg_type:
+            raise ValueError("not a special argument")
+        elif arg_type.group(1) not in config.SPECIAL_ARG_TYPES:
+            raise ValueError(
+                f"unrecognized special argument type '{arg_type.group(1)}'"
+            )
         else:
+            raise ValueError("invalid special argument")
+
+    if m.group("stored"):
+        keyparts = m.group("storedkey")[1:].split(".")
+        if len(keyparts) > 4:
             raise KeyError("too many subkeys")
-        return arg_type.group(1), [key, subkey, subsubkey, subsubsubkey]
-    elif rand:
-        if rand.group(1) > rand.group(2):
-            raise ValueError("range's lower bound must be less than its upper bound")
-        else:
-            return arg_type.group(1), [rand.group(1), rand.group(2)]
+        # key, subkey, subsubkey, subsubsubkey
+        return "stored", keyparts + [None] * (4 - len(keyparts))
     else:
-        raise ValueError("invalid special argument")
+        lo = int(m.group("lo"))
+        hi = int(m.group("hi"))
+        if lo > hi:
+            raise ValueError("range's lower bound must be less than its upper bound")
+        return "random", [lo, hi]
 
 
 def transform_arg(score: "Score", measure: "Measure", player: "Player", a: str) -> Any:
-    if type(a) == str and a.startswith("johann."):
-        try:
-            arg_type, arg_split = parse_special_arg(a)
-            if arg_type == "stored":
-                if measure.lazy_fetch_stored:
-                    # add the score_name so the player knows the right URL to use
-                    new_a = f"johann.stored.{score.name}.{'.'.join(arg_split)}"
-                    return (
-                        new_a  # the player will fetch from conductor at measure runtime
-                    )
-                else:
-                    success, msg, code, data = score.fetch_stored_data(
-                        *tuple(arg_split)
-                    )
-                    if not success:
-                        raise KeyError(msg)
+    if not (isinstance(a, str) and a.startswith(_JOHANN_PREFIX)):
+        return a
+
+    try:
+        arg_type, arg_split = parse_special_arg(a)
+        if arg_type == "stored":
+            if measure.lazy_fetch_stored:
+                # add the score_name so the player knows the right URL to use
+                keys = ".".join(k for k in arg_split if k is not None)
+                new_a = f"johann.stored.{score.name}.{keys}"
+                return new_a  # the player will fetch from conductor at measure runtime
+            else:
+                success, msg, code, data = score.fetch_stored_data(*tuple(arg_split))
+                if not success:
+                    raise KeyError(msg)
+                if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(gudlog(msg, score, player, measure))
-                    return data
-            elif arg_type == "random":
-                new_arg = random.randint(int(arg_split[0]), int(arg_split[1]))
+                return data
+        elif arg_type == "random":
+            new_arg = random.randint(arg_split[0], arg_split[1])
+            if logger.isEnabledFor(logging.DEBUG):
                 msg = f"'{a}' randomized to {new_arg}"
                 logger.debug(gudlog(msg, score, player, measure))
-                return new_arg
-        except ValueError:
-            msg = gudexc(
-                f"Failed to transform special argument '{a}'", score, player, measure
-            )
-            logger.debug(msg)
-            raise
-    else:
-        return a
+            return new_arg
+    except ValueError:
+        msg = gudexc(
+            f"Failed to transform special argument '{a}'", score, player, measure
+        )
+        logger.debug(msg)
+        raise
 
 
+@functools.lru_cache(maxsize=64)
 def resource_listdir_noext(package_name: str, directory: str) -> List[str]:
     """Same as pkg_resources.resource_listdir but removes file extensions.
 
@@ -570,7 +791,7 @@ def resource_listdir_noext(package_name: str, directory: str) -> List[str]:
         The resource filenames with their extensions removed.
     """
     resources = pkg_resources.resource_listdir(package_name, directory)
-    return [os.path.splitext(x)[0] for x in resources]
+    return [x.rpartition(".")[0] or x for x in resources]
 
 
 def get_score_resources(score_dir: str = "scores") -> Dict[str, List[str]]:
@@ -584,6 +805,9 @@ def get_score_resources(score_dir: str = "scores") -> Dict[str, List[str]]:
     Returns:
         A dict mapping package names to score resource names.
     """
+    if score_dir in _score_resources_cache:
+        return _score_resources_cache[score_dir]
+
     score_resources = {"johann": resource_listdir_noext("johann", score_dir)}
     for plugin_name in active_plugins:
         if not pkg_resources.resource_isdir(plugin_name, score_dir):
@@ -592,6 +816,8 @@ def get_score_resources(score_dir: str = "scores") -> Dict[str, List[str]]:
         plugin_scores = resource_listdir_noext(plugin_name, score_dir)
         logger.debug(f"{plugin_name}: found these scores: {plugin_scores}")
         score_resources[plugin_name] = plugin_scores
+
+    _score_resources_cache[score_dir] = score_resources
     return score_resources
 
 
@@ -601,6 +827,7 @@ def johann_response(
     status_code: int = 200,
     data: Any = None,
     sort_keys: bool = False,
+    pretty: bool = True,
 ) -> aiohttp.web.Response:
     if msgs is None:
         msgs = []
@@ -609,8 +836,25 @@ def johann_response(
 
     ret = {"success": success, "messages": msgs, "data": data}
 
+    body = None
+    if orjson is not None and not pretty:
+        # orjson only indents by two spaces, so pretty output always uses json
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            body = orjson.dumps(ret, option=option)
+        except orjson.JSONEncodeError:  # e.g. integers wider than 64 bits
+            pass
+    if body is None:
+        if pretty:
+            body_str = json.dumps(ret, indent=4, sort_keys=sort_keys)
+        else:
+            body_str = json.dumps(ret, separators=(",", ":"), sort_keys=sort_keys)
+        body = body_str.encode("utf-8")
+
     return aiohttp.web.Response(
-        body=json.dumps(ret, indent=4, sort_keys=sort_keys).encode("utf-8"),
+        body=body,
         content_type="application/json",
         status=status_code,
     )
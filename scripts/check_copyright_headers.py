@@ -5,10 +5,12 @@
 
 """Checks file(s) for the Johann copyright header."""
 
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 from pre_commit import output
 
@@ -19,43 +21,55 @@ EXPECTED_HEADER = (
 )
 
 
+# the header is expected at the very top of the file, so only that much is read
+_HEADER_READ_SIZE = 2048
+_RX_SHEBANG = re.compile(r'#![/"].*')
+_RX_CODING = re.compile(r"coding[=:]\s*([-\w.]+)")
+
+
 def get_header_lines(fpath: Path) -> List[str]:
     h_lines = []
     with fpath.open() as f:
-        for line in f:
-            # skip shebang
-            if re.match(r'#![/"].*', line):
-                continue
-            # skip encoding declaration
-            elif re.search(r"coding[=:]\s*([-\w.]+)", line):
-                continue
-            # skip blank lines
-            elif line.strip() in ["", "#"]:
-                continue
-            else:
-                h_lines.append(line)
-
-            if len(h_lines) == 3:
-                break
+        text = f.read(_HEADER_READ_SIZE)
+    for line in text.splitlines(keepends=True):
+        # skip shebang
+        if _RX_SHEBANG.match(line):
+            continue
+        # skip encoding declaration
+        elif _RX_CODING.search(line):
+            continue
+        # skip blank lines
+        elif line.strip() in ["", "#"]:
+            continue
+        else:
+            h_lines.append(line)
+
+        if len(h_lines) == 3:
+            break
     return h_lines
 
 
+def check_one(filename: str) -> Tuple[int, Optional[str]]:
+    filepath = Path(filename)
+    if not filepath.is_file():
+        return 0, None
+
+    header_lines = get_header_lines(filepath)
+    if len(header_lines) < 3:
+        return 1, f"{filename}: (not enough lines)\n"
+    elif "".join(header_lines) != EXPECTED_HEADER:
+        return 1, f"{filename}:\n  {'  '.join(header_lines)}"
+    else:
+        return 0, None
+
+
 if __name__ == "__main__":
     retv = 0
-    for filename in sys.argv[1:]:
-        filepath = Path(filename)
-        if not filepath.is_file():
-            continue
-
-        header_lines = get_header_lines(filepath)
-        if len(header_lines) < 3:
-            retv |= 1
-            output.write_line(f"{filename}: (not enough lines)")
-        else:
-            header = "".join(header_lines)
-            if header != EXPECTED_HEADER:
-                retv |= 1
-                output.write(f"{filename}:\n  {'  '.join(header_lines)}")
-            else:
-                retv |= 0
+    # each check is a small read, so threads overlap the I/O; results keep arg order
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_retv, msg in executor.map(check_one, sys.argv[1:]):
+            retv |= file_retv
+            if msg:
+                output.write(msg)
     sys.exit(retv)
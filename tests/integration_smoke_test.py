@@ -18,6 +18,9 @@ CONDUCTOR_URL = os.getenv("CONDUCTOR_URL", "http://johann_conductor:5000")
 config = JohannConfig.get_config()
 logger = JohannLogger(__name__).logger
 
+# reuse connections to the conductor across requests
+_session = requests.Session()
+
 
 @pytest.fixture(autouse=True)
 # fix an annoying artifact of pytest's otherwise useful '-s' mode
@@ -27,15 +30,18 @@ def prettier_output():
     print()
 
 
-def wait_for_score(score, expect_success=True, timeout=300, check_interval=5):
+def wait_for_score(
+    score, expect_success=True, timeout=300, check_interval=5, max_check_interval=30
+):
     logger.info(f"Waiting for {score} to complete...")
 
-    now = time.time()
+    now = time.monotonic()
     end = now + timeout
     last_state = None
+    interval = check_interval
 
     while now < end:
-        r = requests.get(f"{CONDUCTOR_URL}/scores/{score}/status")
+        r = _session.get(f"{CONDUCTOR_URL}/scores/{score}/status", timeout=10)
         rjson = r.json()
         finished = rjson["data"]["finished"]
         state = rjson["data"]["state"]
@@ -51,9 +57,14 @@ def wait_for_score(score, expect_success=True, timeout=300, check_interval=5):
 
             return state
         else:
+            # back off while nothing changes; poll quickly again after a change
+            if state == last_state:
+                interval = min(interval * 1.5, max_check_interval)
+            else:
+                interval = check_interval
             last_state = state
-            time.sleep(check_interval)
-            now = time.time()
+            time.sleep(max(0, min(interval, end - now)))
+            now = time.monotonic()
 
     raise TimeoutError
 
@@ -61,7 +72,7 @@ def wait_for_score(score, expect_success=True, timeout=300, check_interval=5):
 def launch_score(score, reset=True):
     # check if the score has already been launched
     url = f"{CONDUCTOR_URL}/scores/{score}/status_short"
-    r = requests.get(url)
+    r = _session.get(url, timeout=10)
     assert r.status_code == 200
     assert r.ok
     rjson = r.json()
@@ -73,7 +84,7 @@ def launch_score(score, reset=True):
 
         logger.info(f"{score} already finished; resetting and running again...")
         url = f"{CONDUCTOR_URL}/read_score/{score}?force=1"
-        r = requests.get(url)
+        r = _session.get(url, timeout=10)
         assert r.ok
 
     # launch the score
@@ -82,7 +93,7 @@ def launch_score(score, reset=True):
         "create_hosts": False,
         "discard_hosts": False,
     }
-    r = requests.post(url, json=params)
+    r = _session.post(url, json=params, timeout=10)
     assert r.ok
     result = wait_for_score(score)
     assert result == TaskState.SUCCESS